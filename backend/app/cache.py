@@ -0,0 +1,187 @@
+import abc
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "cache.sqlite3")
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 100000
+# How long a worker waits for another worker's write lock. Cache calls run on
+# the event loop, so this bounds the stall; a write that times out is skipped.
+BUSY_TIMEOUT = 0.1
+
+
+class SQLiteCache:
+    """
+    Key/value cache stored in SQLite with write-ahead logging.
+
+    WAL lets every uvicorn worker process read concurrently while one writes,
+    so parse, SDK and semantic results computed by one worker are hits in all
+    the others. Each process opens its own connection; open it after the
+    worker has started (in the lifespan hook), not at import time.
+
+    Entries expire after default_ttl seconds (0 or None keeps them forever)
+    and the oldest writes are evicted beyond max_entries. Writes purge both
+    every purge_interval seconds.
+    """
+
+    purge_interval = 300.0
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, default_ttl: Optional[float] = DEFAULT_TTL,
+                 max_entries: Optional[int] = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        self._next_purge = 0.0
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Hashes the inputs of a cached computation into a fixed-size key.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return value
+
+    def set(self, namespace: str, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, value, expires_at),
+                )
+        except sqlite3.OperationalError as e:
+            # Another worker holding the write lock past the timeout should not fail the request.
+            logger.warning(f"Cache write skipped: {e}")
+            return
+        if time.monotonic() >= self._next_purge:
+            self.purge_expired()
+
+    def purge_expired(self) -> None:
+        """
+        Deletes expired entries, then the oldest writes beyond max_entries.
+        """
+        self._next_purge = time.monotonic() + self.purge_interval
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+                if self.max_entries:
+                    # INSERT OR REPLACE assigns a new rowid, so rowid order is write order.
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE rowid IN "
+                        "(SELECT rowid FROM cache ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,),
+                    )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache purge skipped: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedStore(abc.ABC, Generic[T]):
+    """
+    Objects built from a serialized definition, by id. Definitions are
+    persisted in the shared cache so any worker can rebuild an object added
+    by another; each worker keeps its most recently used objects in memory.
+    Subclasses serialize in add() and rebuild in load().
+    """
+
+    namespace = ""
+
+    def __init__(self, cache: SQLiteCache, max_items: int = 16):
+        self.cache = cache
+        self.max_items = max_items
+        self._items: "OrderedDict[str, T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def add(self, *args, **kwargs) -> Tuple[str, T]:
+        """
+        Serializes a definition and returns the id and object from _add().
+        """
+
+    @abc.abstractmethod
+    def load(self, raw: str) -> T:
+        """
+        Rebuilds the object from a definition serialized by add().
+        """
+
+    def _add(self, raw: str, build: Callable[[], T]) -> Tuple[str, T]:
+        # Ids are content hashes, so adding the same definition again is a lookup.
+        item_id = SQLiteCache.make_key(raw)[:32]
+        item = self._get_cached(item_id)
+        if item is None:
+            self.cache.set(self.namespace, item_id, raw)
+            item = self._remember(item_id, build())
+        return item_id, item
+
+    def get(self, item_id: str) -> Optional[T]:
+        item = self._get_cached(item_id)
+        if item is not None:
+            return item
+        raw = self.cache.get(self.namespace, item_id)
+        if raw is None:
+            return None
+        return self._remember(item_id, self.load(raw))
+
+    def _get_cached(self, item_id: str) -> Optional[T]:
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is not None:
+                self._items.move_to_end(item_id)
+            return item
+
+    def _remember(self, item_id: str, item: T) -> T:
+        with self._lock:
+            self._items[item_id] = item
+            self._items.move_to_end(item_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return item
@@ -0,0 +1,267 @@
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.cache import CachedStore
+from app.models import ApiSchema, Endpoint
+
+_intern = sys.intern
+
+
+def split_path(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def path_param_name(segment: str) -> Optional[str]:
+    # Path templates use {name}; some docs (and LLM output) use :name instead.
+    if len(segment) > 2 and segment[0] == "{" and segment[-1] == "}":
+        return segment[1:-1]
+    if len(segment) > 1 and segment[0] == ":":
+        return segment[1:]
+    return None
+
+
+class CompactParameter:
+    __slots__ = ("name", "type", "required", "description")
+
+    def __init__(self, name: str, type: str, required: bool, description: Optional[str]):
+        self.name = _intern(name)
+        self.type = _intern(type)
+        self.required = required
+        self.description = description
+
+
+class CompactEndpoint:
+    """
+    Slotted, read-only copy of an Endpoint. Repeated strings (methods,
+    parameter names and types) are interned, so tens of thousands of
+    endpoints take a fraction of the memory of the pydantic models.
+    """
+
+    __slots__ = ("path", "method", "description", "parameters", "response_schema")
+
+    def __init__(self, endpoint: Endpoint):
+        self.path = endpoint.path
+        self.method = _intern(endpoint.method.upper())
+        self.description = endpoint.description
+        self.parameters = tuple(
+            CompactParameter(p.name, p.type, p.required, p.description) for p in endpoint.parameters
+        )
+        self.response_schema = endpoint.response_schema
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "method": self.method,
+            "description": self.description,
+            "parameters": [
+                {"name": p.name, "type": p.type, "required": p.required, "description": p.description}
+                for p in self.parameters
+            ],
+            "response_schema": self.response_schema,
+        }
+
+    def to_endpoint(self) -> Endpoint:
+        return Endpoint(**self.to_dict())
+
+
+class _Node:
+    __slots__ = ("literals", "param", "param_name", "methods", "duplicates", "count")
+
+    def __init__(self):
+        self.literals: Optional[Dict[str, "_Node"]] = None
+        self.param: Optional["_Node"] = None
+        # Name from the first template using this wildcard; only used for display.
+        self.param_name: Optional[str] = None
+        self.methods: Optional[Dict[str, int]] = None
+        # Later endpoints repeating a method and template; listed, never matched.
+        self.duplicates: Optional[List[int]] = None
+        # Number of endpoints at or below this node, for prefix counts.
+        self.count = 0
+
+
+class EndpointIndex:
+    """
+    Lookup structure over the endpoints of one ApiSchema.
+
+    Path templates are stored in a trie keyed by path segment, with one
+    wildcard edge per node for {param} segments, so a concrete URL is
+    matched in O(path length) instead of scanning every endpoint.
+    Endpoints keep their schema order for paginated listing. When several
+    share a method and template, all are listed but the first one is
+    matched; the positions of the others are in `duplicates`.
+    """
+
+    def __init__(self, endpoints: Iterable[Endpoint], base_url: Optional[str] = None):
+        self.endpoints: List[CompactEndpoint] = []
+        self.duplicates: List[int] = []
+        self.base_path = split_path(urlsplit(base_url).path) if base_url else []
+        self._root = _Node()
+        self._by_method: Dict[str, List[int]] = {}
+
+        for endpoint in endpoints:
+            compact = CompactEndpoint(endpoint)
+            position = len(self.endpoints)
+            if not self._insert(compact, position):
+                self.duplicates.append(position)
+            self._by_method.setdefault(compact.method, []).append(position)
+            self.endpoints.append(compact)
+
+    @classmethod
+    def from_schema(cls, schema: ApiSchema) -> "EndpointIndex":
+        return cls(schema.endpoints, schema.base_url)
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def _insert(self, endpoint: CompactEndpoint, position: int) -> bool:
+        path = []
+        node = self._root
+        for segment in split_path(endpoint.path):
+            name = path_param_name(segment)
+            if name is not None:
+                if node.param is None:
+                    node.param = _Node()
+                    node.param_name = name
+                node = node.param
+            else:
+                if node.literals is None:
+                    node.literals = {}
+                node = node.literals.setdefault(segment, _Node())
+            path.append(node)
+
+        self._root.count += 1
+        for visited in path:
+            visited.count += 1
+        if node.methods is None:
+            node.methods = {}
+        if endpoint.method in node.methods:
+            # Duplicate method and template: listed, but the first one is matched.
+            if node.duplicates is None:
+                node.duplicates = []
+            node.duplicates.append(position)
+            return False
+        node.methods[endpoint.method] = position
+        return True
+
+    def match(self, method: str, url: str) -> Optional[Tuple[CompactEndpoint, Dict[str, str]]]:
+        """
+        Resolves a concrete URL or path, e.g. https://api.example.com/v1/users/42,
+        to its endpoint and path parameters ({"id": "42"}). Literal segments win
+        over parameters; the base URL path is stripped when present.
+        """
+        located = self.locate(method, url)
+        if located is None:
+            return None
+        position, segments = located
+
+        endpoint = self.endpoints[position]
+        # Parameter names come from the endpoint's own template, since templates
+        # sharing a trie node may name the same position differently.
+        params = {}
+        for template, value in zip(split_path(endpoint.path), segments):
+            name = path_param_name(template)
+            if name is not None:
+                params[name] = value
+        return endpoint, params
+
+    def locate(self, method: str, url: str) -> Optional[Tuple[int, List[str]]]:
+        """
+        Like match(), but returns the endpoint's position in self.endpoints and
+        the URL's path segments relative to the base URL.
+        """
+        segments = split_path(urlsplit(url).path)
+        method = method.upper()
+        if self.base_path and segments[:len(self.base_path)] == self.base_path:
+            segments_without_base = segments[len(self.base_path):]
+            position = self._match(self._root, segments_without_base, 0, method)
+            if position is not None:
+                return position, segments_without_base
+        position = self._match(self._root, segments, 0, method)
+        return (position, segments) if position is not None else None
+
+    def _match(self, node: _Node, segments: List[str], i: int, method: str) -> Optional[int]:
+        if i == len(segments):
+            return node.methods.get(method) if node.methods else None
+
+        if node.literals:
+            child = node.literals.get(segments[i])
+            if child is not None:
+                position = self._match(child, segments, i + 1, method)
+                if position is not None:
+                    return position
+        if node.param is not None:
+            return self._match(node.param, segments, i + 1, method)
+        return None
+
+    def _prefix_node(self, prefix: str) -> Optional[_Node]:
+        node = self._root
+        for segment in split_path(prefix):
+            if path_param_name(segment) is not None:
+                node = node.param
+            else:
+                node = node.literals.get(segment) if node.literals else None
+            if node is None:
+                return None
+        return node
+
+    def _positions_under(self, node: _Node) -> List[int]:
+        positions = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.methods:
+                positions.extend(current.methods.values())
+            if current.duplicates:
+                positions.extend(current.duplicates)
+            if current.literals:
+                stack.extend(current.literals.values())
+            if current.param is not None:
+                stack.append(current.param)
+        positions.sort()
+        return positions
+
+    def groups(self) -> Dict[str, int]:
+        """
+        Endpoint counts per first path segment (e.g. /users, /orders), the
+        closest thing to tags the parsed schemas have.
+        """
+        groups = {}
+        if self._root.methods:
+            groups["/"] = len(self._root.methods) + len(self._root.duplicates or ())
+        for segment, child in (self._root.literals or {}).items():
+            groups[f"/{segment}"] = child.count
+        if self._root.param is not None:
+            groups[f"/{{{self._root.param_name}}}"] = self._root.param.count
+        return groups
+
+    def page(self, offset: int = 0, limit: int = 50, method: Optional[str] = None,
+             prefix: Optional[str] = None) -> Tuple[List[CompactEndpoint], int]:
+        """
+        Returns one page of endpoints in schema order plus the total number of
+        matches, optionally filtered by method and path prefix.
+        """
+        if prefix and split_path(prefix):
+            node = self._prefix_node(prefix)
+            positions = self._positions_under(node) if node is not None else []
+            if method:
+                positions = [p for p in positions if self.endpoints[p].method == method.upper()]
+        elif method:
+            positions = self._by_method.get(method.upper(), [])
+        else:
+            return self.endpoints[offset:offset + limit], len(self.endpoints)
+        return [self.endpoints[p] for p in positions[offset:offset + limit]], len(positions)
+
+
+class EndpointIndexStore(CachedStore[EndpointIndex]):
+    """
+    Registered schemas by id; see CachedStore.
+    """
+
+    namespace = "schema"
+
+    def add(self, schema: ApiSchema) -> Tuple[str, EndpointIndex]:
+        return self._add(schema.model_dump_json(), lambda: EndpointIndex.from_schema(schema))
+
+    def load(self, raw: str) -> EndpointIndex:
+        return EndpointIndex.from_schema(ApiSchema.model_validate_json(raw))
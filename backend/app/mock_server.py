@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import os
+import random
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.cache import CachedStore, SQLiteCache
+from app.endpoint_index import CompactEndpoint, EndpointIndex, path_param_name
+from app.models import ApiSchema
+from app.serialization import dumps_json
+from app.services.health_checker import recording_key
+from app.services.response_validator import is_json_schema, type_names
+
+logger = logging.getLogger(__name__)
+
+# (status, headers, body), encoded once and sent as is.
+_Response = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+_NO_BODY_STATUSES = (204, 304)
+
+# Example values for type names that imply a format.
+_FORMAT_EXAMPLES = {
+    "date": "2024-01-01",
+    "datetime": "2024-01-01T00:00:00Z",
+    "date-time": "2024-01-01T00:00:00Z",
+    "uuid": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+    "url": "https://example.com",
+    "uri": "https://example.com",
+    "email": "user@example.com",
+}
+_TYPE_EXAMPLES = {"string": "string", "integer": 1, "number": 1.5, "boolean": True, "any": None, "null": None}
+_TYPE_PREFERENCE = ("object", "array", "string", "integer", "number", "boolean", "any", "null")
+
+
+def _example_for_types(types, format_name: Optional[str] = None) -> Any:
+    if format_name and format_name.lower() in _FORMAT_EXAMPLES and "string" in types:
+        return _FORMAT_EXAMPLES[format_name.lower()]
+    for name in _TYPE_PREFERENCE:
+        if name in types:
+            if name == "object":
+                return {}
+            if name == "array":
+                return []
+            return _TYPE_EXAMPLES[name]
+    return None
+
+
+def synthesize_example(schema: Any) -> Any:
+    """
+    Builds an example document from a response_schema, in either of the forms
+    compile_schema() understands. Examples and defaults given in the schema
+    are used as is; otherwise each type gets a placeholder value.
+    """
+    if is_json_schema(schema):
+        for key in ("example", "default"):
+            if key in schema:
+                return schema[key]
+        for key in ("examples", "enum"):
+            if isinstance(schema.get(key), list) and schema[key]:
+                return schema[key][0]
+        declared = schema.get("type")
+        types = {declared} if isinstance(declared, str) else set(declared or ())
+        if "properties" in schema or "object" in types:
+            return {key: synthesize_example(value) for key, value in (schema.get("properties") or {}).items()}
+        if "items" in schema or "array" in types:
+            items = schema.get("items")
+            return [synthesize_example(items)] if isinstance(items, dict) else []
+        return _example_for_types(types or {"any"}, schema.get("format"))
+    if isinstance(schema, dict):
+        return {key: synthesize_example(value) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [synthesize_example(schema[0])] if schema else []
+    if isinstance(schema, str):
+        names = type_names(schema)
+        if names is None:
+            return schema  # An example value rather than a type name.
+        return _example_for_types(names, schema.split("(")[0].split("|")[0].strip())
+    return schema
+
+
+@dataclass(frozen=True)
+class MockConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+
+def _json_response(status: int, body: bytes, source: bytes) -> _Response:
+    return status, [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"x-mock-source", source),
+    ], body
+
+
+async def _send(send, response: _Response) -> None:
+    status, headers, body = response
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+class MockServer:
+    """
+    ASGI app serving canned responses for the endpoints of an ApiSchema.
+
+    Requests are routed by method and path template through an EndpointIndex.
+    Each endpoint answers with the body `client` recorded by an earlier live
+    health check of the same URL when the cache has one, and otherwise with an
+    example synthesized from its response_schema. Bodies are encoded once up
+    front, so a request costs a trie lookup and two sends.
+
+    MockConfig adds latency (latency_ms +/- jitter_ms) and fails error_rate
+    of the requests with error_status. A request can force a status from 200
+    to 599 with the X-Mock-Status header.
+    """
+
+    max_recorded = 10000
+
+    def __init__(self, schema: ApiSchema, config: MockConfig = MockConfig(), cache: Optional[SQLiteCache] = None,
+                 client: Optional[str] = None):
+        self.config = config
+        # Recordings are only replayed to mocks created by the client that made them.
+        self.cache = cache if client is not None else None
+        self.client = client
+        self.base_url = (schema.base_url or "").rstrip("/")
+        self.index = EndpointIndex.from_schema(schema)
+        self._templated = [
+            any(path_param_name(segment) is not None for segment in endpoint.path.split("/"))
+            for endpoint in self.index.endpoints
+        ]
+        self._responses = [
+            self._response_for(endpoint, templated)
+            for endpoint, templated in zip(self.index.endpoints, self._templated)
+        ]
+        # Recordings of concrete URLs of templated endpoints, looked up on first request.
+        self._recorded: Dict[Tuple[int, str], Optional[_Response]] = {}
+        self._error = _json_response(
+            config.error_status, dumps_json({"detail": "Injected error"}), b"injected"
+        )
+        self._random = random.Random()
+
+    def _lookup_recording(self, method: str, path: str) -> Optional[_Response]:
+        if self.cache is None or not self.base_url:
+            return None
+        raw = self.cache.get("recorded", recording_key(self.client, method, self.base_url + path))
+        return _json_response(200, raw.encode("utf-8"), b"recorded") if raw is not None else None
+
+    def _response_for(self, endpoint: CompactEndpoint, templated: bool) -> _Response:
+        if not templated:
+            recorded = self._lookup_recording(endpoint.method, endpoint.path)
+            if recorded is not None:
+                return recorded
+        example = synthesize_example(endpoint.response_schema) if endpoint.response_schema is not None else {}
+        return _json_response(200, dumps_json(example), b"synthesized")
+
+    def _templated_response(self, position: int, segments: List[str]) -> _Response:
+        endpoint = self.index.endpoints[position]
+        path = "/" + "/".join(segments)
+        key = (position, path)
+        if key in self._recorded:
+            return self._recorded[key] or self._responses[position]
+        if len(self._recorded) >= self.max_recorded:
+            self._recorded.clear()
+        recorded = self._recorded[key] = self._lookup_recording(endpoint.method, path)
+        return recorded or self._responses[position]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        located = self.index.locate(method, scope["path"])
+        if located is None:
+            body = dumps_json({"detail": f"No mocked endpoint for {method} {scope['path']}"})
+            await _send(send, _json_response(404, body, b"mock"))
+            return
+
+        config = self.config
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += self._random.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        forced = None
+        for name, value in scope["headers"]:
+            if name == b"x-mock-status":
+                forced = int(value) if value.isdigit() and len(value) == 3 else 0
+                if not 200 <= forced <= 599:
+                    body = dumps_json({"detail": "X-Mock-Status must be a status code from 200 to 599"})
+                    await _send(send, _json_response(400, body, b"mock"))
+                    return
+                break
+        if forced is not None and forced >= 400:
+            await _send(send, _json_response(forced, dumps_json({"detail": "Forced error"}), b"forced"))
+            return
+        if config.error_rate and self._random.random() < config.error_rate:
+            await _send(send, self._error)
+            return
+
+        position, segments = located
+        if self.cache is not None and self._templated[position]:
+            response = self._templated_response(position, segments)
+        else:
+            response = self._responses[position]
+        if forced in _NO_BODY_STATUSES:
+            # These responses must not carry a body, nor a length announcing one.
+            response = (forced, [header for header in response[1] if header[0] == b"x-mock-source"], b"")
+        elif forced is not None:
+            response = (forced,) + response[1:]
+        await _send(send, response)
+
+
+class MockServerStore(CachedStore[MockServer]):
+    """
+    Mock servers by id; see CachedStore.
+    """
+
+    namespace = "mock"
+
+    def add(self, schema: ApiSchema, config: MockConfig, client: Optional[str] = None) -> Tuple[str, MockServer]:
+        raw = json.dumps({"schema": schema.model_dump(mode="json"), "config": asdict(config), "client": client})
+        return self._add(raw, lambda: MockServer(schema, config, self.cache, client))
+
+    def load(self, raw: str) -> MockServer:
+        stored = json.loads(raw)
+        return MockServer(ApiSchema.model_validate(stored["schema"]), MockConfig(**stored["config"]), self.cache,
+                          stored.get("client"))
+
+
+class MockDispatcher:
+    """
+    ASGI app mounted at /mock: routes /mock/{mock_id}/... to that mock server.
+    """
+
+    def __init__(self, get_store: Callable[[], MockServerStore]):
+        self.get_store = get_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        mock_id, _, rest = path.lstrip("/").partition("/")
+        server = self.get_store().get(mock_id)
+        if server is None:
+            await _send(send, _json_response(404, dumps_json({"detail": f"Unknown mock id '{mock_id}'"}), b"mock"))
+            return
+        await server(dict(scope, path="/" + rest, root_path=f"{root_path}/{mock_id}"), receive, send)
+
+
+def create_app_from_env() -> MockServer:
+    """
+    App factory for run_mock_server.py, which passes its options through the
+    environment so every uvicorn worker builds the same server.
+    """
+    with open(os.environ["MOCK_SCHEMA_PATH"]) as f:
+        schema = ApiSchema.model_validate_json(f.read())
+    config = MockConfig(
+        latency_ms=float(os.getenv("MOCK_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("MOCK_JITTER_MS", "0")),
+        error_rate=float(os.getenv("MOCK_ERROR_RATE", "0")),
+        error_status=int(os.getenv("MOCK_ERROR_STATUS", "503")),
+    )
+    cache_path = os.getenv("CACHE_PATH")
+    # Only reads the backend's cache; eviction is left to the backend's own settings.
+    cache = SQLiteCache(cache_path, max_entries=None) if cache_path and os.path.exists(cache_path) else None
+    client = os.getenv("MOCK_CLIENT") or None
+    logger.info(f"Mocking {len(schema.endpoints)} endpoints of '{schema.title}' "
+                f"({f'with responses recorded by {client}' if cache and client else 'without recorded responses'})")
+    return MockServer(schema, config, cache, client)
@@ -19,3 +19,22 @@ class ApiSchema(BaseModel):
     description: Optional[str] = Field(None, description="Description of the API")
     base_url: Optional[str] = Field(None, description="Base URL for the API")
     endpoints: List[Endpoint] = Field(default_factory=list, description="List of endpoints found in the documentation")
+
+class SemanticMapRequest(BaseModel):
+    api_schema: ApiSchema = Field(..., alias="schema", description="Schema to search for a matching endpoint")
+    query: str = Field(..., description="Natural language description of the desired operation")
+
+class MockServerRequest(BaseModel):
+    api_schema: ApiSchema = Field(..., alias="schema", description="Schema whose endpoints are mocked")
+    latency_ms: float = Field(0.0, ge=0, le=60000, description="Delay added to every response")
+    jitter_ms: float = Field(0.0, ge=0, le=60000, description="Random variation of the delay, in both directions")
+    error_rate: float = Field(0.0, ge=0, le=1, description="Share of requests answered with error_status")
+    error_status: int = Field(503, ge=400, le=599, description="Status code of injected errors")
+
+class ContractTestRequest(BaseModel):
+    api_schema: ApiSchema = Field(..., alias="schema", description="Schema whose endpoints are tested")
+    runs: int = Field(1, ge=1, le=50, description="Number of times each endpoint is called")
+    concurrency: int = Field(10, ge=1, le=64, description="Maximum number of requests in flight")
+    methods: List[str] = Field(default_factory=lambda: ["GET"], description="Only endpoints with these methods are called")
+    path_params: Dict[str, str] = Field(default_factory=dict, description="Values for path parameters such as {id}")
+    headers: Dict[str, str] = Field(default_factory=dict, description="Headers sent with every request, e.g. auth")
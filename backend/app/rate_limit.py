@@ -0,0 +1,238 @@
+import contextvars
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Collection, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    per_minute: float
+    burst: int
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `capacity`.
+    The balance may go negative when a charge is larger than what is left, so
+    an expensive call is paid off by making later requests wait.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Takes cost tokens if available. Returns (acquired, seconds until it would be).
+        """
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate
+
+    def charge(self, cost: float) -> None:
+        self._refill(time.monotonic())
+        self.tokens -= cost
+
+    def balance(self) -> float:
+        self._refill(time.monotonic())
+        return self.tokens
+
+    def seconds_until_positive(self) -> float:
+        return max(0.0, -self.balance()) / self.rate
+
+
+# Token budget of the client whose request is being handled; set by AdmissionMiddleware.
+_llm_budget: contextvars.ContextVar[Optional[TokenBucket]] = contextvars.ContextVar("llm_budget", default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English prose and JSON.
+    return len(text) // 4 + 1
+
+
+def charge_llm_tokens(prompt: str) -> None:
+    """
+    Charges the prompt against the current client's LLM token budget.
+    Call before sending the prompt; raises RateLimitExceeded when the budget is
+    exhausted. Outside a request (scripts, benchmarks) this is a no-op.
+    """
+    budget = _llm_budget.get()
+    if budget is None:
+        return
+    if budget.balance() <= 0:
+        raise RateLimitExceeded("LLM token budget exhausted", budget.seconds_until_positive())
+    budget.charge(estimate_tokens(prompt))
+
+
+def client_identity(scope, api_keys: Collection[bytes] = ()) -> str:
+    """
+    Identifies the client of a request: "key:<hash>" when it sent one of
+    api_keys as X-API-Key, otherwise "ip:<address>". Keys are hashed so the
+    identity can be stored and logged.
+    """
+    if api_keys:
+        for name, value in scope.get("headers", []):
+            if name == b"x-api-key":
+                if value in api_keys:
+                    return "key:" + hashlib.sha256(value).hexdigest()[:16]
+                break
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class AdmissionMiddleware:
+    """
+    Per-client admission control for /api routes, applied before any work is done:
+
+    - a token bucket per client and one per client and route,
+    - a cap on concurrent requests per route for the expensive routes, and
+      on the share of those slots a single client may hold,
+    - an LLM token budget per client, charged by the services through
+      charge_llm_tokens() with the size of each prompt.
+
+    Clients are identified by IP address, or by X-API-Key when the key is one
+    of api_keys; unknown keys are ignored so rotating them gains nothing.
+    At most max_buckets buckets are kept, least recently used evicted first.
+
+    Rejected requests get 429 with Retry-After immediately. State is kept per
+    worker process, so with N workers a client may get up to N times the limits.
+    """
+
+    max_buckets = 50000
+
+    def __init__(
+        self,
+        app,
+        default_limit: RateLimit,
+        route_limits: Optional[Dict[str, RateLimit]] = None,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        client_concurrency: Optional[int] = None,
+        llm_tokens_per_minute: Optional[float] = None,
+        llm_paths: Tuple[str, ...] = (),
+        exempt_paths: Tuple[str, ...] = ("/api/health",),
+        api_keys: Iterable[str] = (),
+    ):
+        self.app = app
+        self.default_limit = default_limit
+        self.route_limits = route_limits or {}
+        self.concurrency_limits = concurrency_limits or {}
+        self.client_concurrency = client_concurrency
+        self.llm_tokens_per_minute = llm_tokens_per_minute
+        self.llm_paths = llm_paths
+        self.exempt_paths = exempt_paths
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys if key)
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._in_flight: Dict[str, int] = {}
+        self._client_in_flight: Dict[Tuple[str, str], int] = {}
+
+    def client_id(self, scope) -> str:
+        return client_identity(scope, self.api_keys)
+
+    def _bucket(self, client: str, kind: str, rate: float, capacity: float) -> TokenBucket:
+        key = (client, kind)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+        bucket = self._buckets[key] = TokenBucket(rate, capacity)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def _limit_bucket(self, client: str, kind: str, limit: RateLimit) -> TokenBucket:
+        return self._bucket(client, kind, limit.per_minute / 60, limit.burst)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        client = self.client_id(scope)
+        ok, retry_after = self._limit_bucket(client, "*", self.default_limit).try_acquire()
+        if not ok:
+            await send_rate_limited(send, "Too many requests", retry_after)
+            return
+
+        route_limit = self.route_limits.get(path)
+        if route_limit is not None:
+            ok, retry_after = self._limit_bucket(client, path, route_limit).try_acquire()
+            if not ok:
+                await send_rate_limited(send, f"Too many requests to {path}", retry_after)
+                return
+
+        budget = None
+        if self.llm_tokens_per_minute:
+            budget = self._bucket(client, "llm", self.llm_tokens_per_minute / 60, self.llm_tokens_per_minute)
+            # Reject up front rather than after scraping a page whose prompt could not be sent.
+            if path in self.llm_paths and budget.balance() <= 0:
+                await send_rate_limited(send, "LLM token budget exhausted", budget.seconds_until_positive())
+                return
+
+        cap = self.concurrency_limits.get(path)
+        slot = (client, path)
+        if cap is not None:
+            if self._in_flight.get(path, 0) >= cap:
+                await send_rate_limited(send, f"Too many concurrent requests to {path}", 1.0)
+                return
+            if self.client_concurrency and self._client_in_flight.get(slot, 0) >= self.client_concurrency:
+                await send_rate_limited(send, f"Too many concurrent requests to {path} from this client", 1.0)
+                return
+            self._in_flight[path] = self._in_flight.get(path, 0) + 1
+            self._client_in_flight[slot] = self._client_in_flight.get(slot, 0) + 1
+
+        token = _llm_budget.set(budget)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _llm_budget.reset(token)
+            if cap is not None:
+                self._in_flight[path] -= 1
+                # Dropped at zero, so the dict only holds clients with requests in flight.
+                if self._client_in_flight[slot] <= 1:
+                    del self._client_in_flight[slot]
+                else:
+                    self._client_in_flight[slot] -= 1
+
+
+def retry_after_header(retry_after: float) -> str:
+    return str(max(1, math.ceil(retry_after)))
+
+
+async def send_rate_limited(send, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", retry_after_header(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+    logger.warning(f"Rejected request: {detail} (retry after {retry_after:.1f}s)")
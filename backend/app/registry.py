@@ -0,0 +1,57 @@
+import inspect
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Builds services on first access instead of at import time.
+
+    Factories are registered up front and typically import their module
+    inside the factory, so a worker only pays for Playwright, the LLM SDKs
+    or Jinja2 once a request actually needs them.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found normally, i.e. services.
+        try:
+            factory = self.__dict__["_factories"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+        instance = self._instances.get(name)
+        if instance is None:
+            logger.info(f"Initializing service '{name}'")
+            instance = self._instances[name] = factory()
+        return instance
+
+    def preload(self) -> None:
+        """
+        Builds every registered service now, e.g. to warm a worker before it takes traffic.
+        """
+        for name in self._factories:
+            getattr(self, name)
+
+    async def close(self) -> None:
+        """
+        Releases resources of the services that were built, in reverse order.
+        """
+        for name, instance in reversed(list(self._instances.items())):
+            close = getattr(instance, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error closing service '{name}': {e}")
+        self._instances.clear()
@@ -0,0 +1,241 @@
+import gzip
+import json
+import zlib
+from typing import Any, Callable, Dict, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional content type
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional content encoding
+    brotli = None
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+# Bodies smaller than this are sent uncompressed; compressing them costs more than it saves.
+MIN_COMPRESS_SIZE = 1024
+# Largest request body accepted after decompression; guards against decompression bombs.
+MAX_DECOMPRESSED_BODY = 16 * 1024 * 1024
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Encodes content as JSON bytes, using pydantic's serializer for models and orjson when available.
+    """
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson (or pydantic) instead of the stdlib encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def _quality_values(header: str) -> Dict[str, float]:
+    """
+    Parses an Accept or Accept-Encoding header into {value: q}.
+    Entries with a malformed q count as q=0.
+    """
+    values = {}
+    for entry in header.split(","):
+        value, *params = entry.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(raw)
+                except ValueError:
+                    q = 0.0
+        values[value] = max(q, values.get(value, 0.0))
+    return values
+
+
+def _accepts_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    accepted = _quality_values(request.headers.get("accept", ""))
+    q = max(accepted.get(t, 0.0) for t in MSGPACK_TYPES)
+    return q > 0 and q >= accepted.get("application/json", 0.0)
+
+
+def _pick_encoding(request: Request) -> str:
+    accepted = _quality_values(request.headers.get("accept-encoding", ""))
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = "", 0.0
+    # On equal q, brotli wins over gzip.
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def encode_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """
+    Serializes content for the client: msgpack or JSON depending on Accept, then
+    brotli or gzip compressed depending on Accept-Encoding for larger bodies.
+    """
+    if _accepts_msgpack(request):
+        data = content.model_dump(mode="json") if isinstance(content, BaseModel) else content
+        body = msgpack.packb(data, use_bin_type=True)
+        media_type = "application/msgpack"
+    else:
+        body = dumps_json(content)
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        encoding = _pick_encoding(request)
+        if encoding == "br":
+            body = brotli.compress(body, quality=4)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=5)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def _body_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"Decompressed request body exceeds {MAX_DECOMPRESSED_BODY} bytes"
+    )
+
+
+def _gunzip(body: bytes) -> bytes:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, MAX_DECOMPRESSED_BODY + 1)
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Malformed gzip request body: {e}")
+    if len(data) > MAX_DECOMPRESSED_BODY or decompressor.unconsumed_tail:
+        raise _body_too_large()
+    if not decompressor.eof or decompressor.unused_data:
+        raise HTTPException(status_code=400, detail="Malformed gzip request body: truncated or trailing data")
+    return data
+
+
+def _unbrotli(body: bytes) -> bytes:
+    decompressor = brotli.Decompressor()
+    try:
+        data = decompressor.process(body, output_buffer_limit=MAX_DECOMPRESSED_BODY + 1)
+    except TypeError:
+        # brotli < 1.2 cannot bound its output.
+        raise HTTPException(status_code=415, detail="Brotli request bodies are not supported")
+    except brotli.error as e:
+        raise HTTPException(status_code=400, detail=f"Malformed brotli request body: {e}")
+    if len(data) > MAX_DECOMPRESSED_BODY:
+        raise _body_too_large()
+    if not decompressor.is_finished():
+        raise HTTPException(status_code=400, detail="Malformed brotli request body: truncated")
+    return data
+
+
+async def read_body(request: Request) -> bytes:
+    """
+    Returns the raw request body, decompressed according to Content-Encoding.
+    Decompressed bodies above MAX_DECOMPRESSED_BODY are rejected with 413.
+    """
+    body = await request.body()
+    encoding = request.headers.get("content-encoding", "").lower()
+    if encoding == "gzip":
+        return _gunzip(body)
+    if encoding == "br":
+        if brotli is None:
+            raise HTTPException(status_code=415, detail="Brotli request bodies are not supported")
+        return _unbrotli(body)
+    return body
+
+
+def _body_errors(exc: ValidationError) -> list:
+    # Match FastAPI's own body errors and keep them JSON serializable:
+    # for invalid JSON the input is the raw bytes of the body.
+    errors = []
+    for error in exc.errors(include_url=False, include_context=False):
+        error["loc"] = ("body",) + tuple(error["loc"])
+        if error["type"] == "json_invalid":
+            error.pop("input", None)
+        errors.append(error)
+    return errors
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any], seen: tuple = ()) -> Any:
+    # Replaces pydantic's "#/$defs/..." references, which would not resolve
+    # from inside an OpenAPI operation. Recursive models keep their reference.
+    if isinstance(schema, list):
+        return [_inline_refs(item, defs, seen) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    ref = schema.get("$ref", "")
+    if ref.startswith("#/$defs/"):
+        name = ref[len("#/$defs/"):]
+        if name not in seen:
+            return _inline_refs(defs[name], defs, seen + (name,))
+        return {"type": "object", "title": name}
+    return {key: _inline_refs(value, defs, seen) for key, value in schema.items()}
+
+
+def body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Returns the openapi_extra documenting model as the request body of a route
+    that reads it with parse_body(), since FastAPI cannot see that body itself.
+    """
+    schema = model.model_json_schema()
+    schema = _inline_refs(schema, schema.pop("$defs", {}))
+    content = {"application/json": {"schema": schema}}
+    if msgpack is not None:
+        content["application/msgpack"] = {"schema": schema}
+    return {"requestBody": {"required": True, "content": content}}
+
+
+def parse_body(model: Type[ModelT]) -> Callable:
+    """
+    Builds a dependency that validates the raw request body straight into model.
+    JSON bodies go through model_validate_json, skipping the intermediate dict
+    FastAPI would build; msgpack bodies are accepted when msgpack is installed.
+    """
+
+    async def dependency(request: Request) -> ModelT:
+        body = await read_body(request)
+        content_type = request.headers.get("content-type", "")
+        try:
+            if any(t in content_type for t in MSGPACK_TYPES):
+                if msgpack is None:
+                    raise HTTPException(status_code=415, detail="msgpack request bodies are not supported")
+                try:
+                    data = msgpack.unpackb(body, raw=False)
+                except (ValueError, msgpack.UnpackException) as e:
+                    raise HTTPException(status_code=400, detail=f"Malformed msgpack request body: {e}")
+                return model.model_validate(data)
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(_body_errors(e))
+
+    return dependency
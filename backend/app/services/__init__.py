@@ -0,0 +1,64 @@
+import os
+
+from app.registry import ServiceRegistry
+
+
+def create_services() -> ServiceRegistry:
+    """
+    Registers the backend services. Each factory imports its module on first
+    use, so heavy dependencies load only when a route needs them.
+    """
+    services = ServiceRegistry()
+
+    def cache():
+        from app.cache import SQLiteCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_TTL
+        return SQLiteCache(
+            os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH),
+            default_ttl=float(os.getenv("CACHE_TTL_SECONDS", DEFAULT_TTL)),
+            max_entries=int(os.getenv("CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+
+    def scraper_service():
+        from app.services.scraper import ScraperService
+        return ScraperService(max_pages=int(os.getenv("SCRAPER_MAX_PAGES", "4")))
+
+    def llm_engine():
+        from app.services.llm_engine import LLMEngine
+        return LLMEngine(cache=services.cache)
+
+    def code_generator():
+        from app.services.code_generator import CodeGenerator
+        return CodeGenerator(cache=services.cache)
+
+    def health_checker():
+        from app.services.health_checker import HealthChecker
+        return HealthChecker(cache=services.cache)
+
+    def quality_analyzer():
+        from app.services.quality_analyzer import QualityAnalyzer
+        return QualityAnalyzer()
+
+    def semantic_mapper():
+        from app.services.semantic_mapper import SemanticMapper
+        return SemanticMapper(cache=services.cache)
+
+    def exporter():
+        from app.services.exporter import Exporter
+        return Exporter()
+
+    def endpoint_indexes():
+        from app.endpoint_index import EndpointIndexStore
+        return EndpointIndexStore(services.cache)
+
+    def contract_tester():
+        from app.services.contract_tester import ContractTester
+        return ContractTester(cache=services.cache)
+
+    def mock_servers():
+        from app.mock_server import MockServerStore
+        return MockServerStore(services.cache)
+
+    for factory in (cache, scraper_service, llm_engine, code_generator, health_checker, quality_analyzer,
+                    semantic_mapper, exporter, endpoint_indexes, contract_tester, mock_servers):
+        services.register(factory.__name__, factory)
+    return services
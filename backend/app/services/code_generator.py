@@ -1,13 +1,9 @@
-from jinja2 import Template
+from app.cache import SQLiteCache
 from app.models import ApiSchema, Endpoint
+from typing import Optional
 import json
 
-class CodeGenerator:
-    def generate_python_sdk(self, schema: ApiSchema) -> str:
-        """
-        Generates a Python SDK based on the provided ApiSchema using Jinja2 templates.
-        """
-        template_str = """import requests
+SDK_TEMPLATE = """import requests
 
 class Client:
     def __init__(self, base_url="{{ schema.base_url }}", api_key=None):
@@ -33,8 +29,36 @@ class Client:
         )
     {% endfor %}
 """
-        template = Template(template_str)
-        return template.render(schema=schema)
+
+class CodeGenerator:
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        self.cache = cache
+        self._sdk_template = None
+
+    @property
+    def sdk_template(self):
+        # Compiled once on first use; compiling dominated small SDK renders.
+        if self._sdk_template is None:
+            from jinja2 import Template
+            self._sdk_template = Template(SDK_TEMPLATE)
+        return self._sdk_template
+
+    def generate_python_sdk(self, schema: ApiSchema) -> str:
+        """
+        Generates a Python SDK based on the provided ApiSchema using Jinja2 templates.
+        Results are cached by schema content when a cache is configured.
+        """
+        if not self.cache:
+            return self.sdk_template.render(schema=schema)
+
+        cache_key = SQLiteCache.make_key(schema.model_dump_json())
+        cached = self.cache.get("sdk", cache_key)
+        if cached is not None:
+            return cached
+
+        code = self.sdk_template.render(schema=schema)
+        self.cache.set("sdk", cache_key, code)
+        return code
 
     def generate_snippet(self, endpoint: Endpoint, base_url: str, language: str) -> str:
         """
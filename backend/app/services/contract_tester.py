@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import quote
+
+from app.endpoint_index import path_param_name, split_path
+from app.models import ApiSchema, Endpoint
+from app.services.response_validator import Check, Issue, StreamingValidator, compile_schema, validate_json
+
+if TYPE_CHECKING:
+    import httpx
+    from app.cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# Drift kinds that break clients; "unexpected" fields are reported but additive.
+BREAKING_KINDS = ("type", "missing", "enum")
+
+
+class _EndpointRuns:
+    """
+    Aggregated results of one endpoint over all runs.
+    """
+
+    __slots__ = ("endpoint", "url", "requests", "validated", "status_codes", "latency_total", "latency_max",
+                 "errors", "drift")
+
+    def __init__(self, endpoint: Endpoint, url: str):
+        self.endpoint = endpoint
+        self.url = url
+        self.requests = 0
+        self.validated = 0
+        self.status_codes: Counter = Counter()
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.errors: Counter = Counter()
+        # Issue -> [responses it was seen in, total occurrences]
+        self.drift: Dict[Issue, List[int]] = {}
+
+
+class ContractTester:
+    """
+    Calls a schema's endpoints and validates the response bodies against
+    their response_schema, reporting field-level drift across runs.
+
+    Validators are compiled once per endpoint and cached. Bodies above
+    stream_threshold (or of unknown length) are validated while they stream
+    in instead of being buffered. With a cache, the drift of each endpoint is
+    remembered so the report can flag what is new since the previous test.
+    """
+
+    max_validators = 10000
+    stream_threshold = 1024 * 1024
+
+    def __init__(self, cache: Optional["SQLiteCache"] = None):
+        self.cache = cache
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._validators: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], Check]]" = OrderedDict()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            import httpx
+            self._client = httpx.AsyncClient(timeout=30.0, limits=httpx.Limits(max_connections=100))
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def validator_for(self, endpoint: Endpoint) -> Optional[Check]:
+        """
+        Returns the compiled validator of the endpoint's response_schema, compiling it on first use.
+        """
+        if endpoint.response_schema is None:
+            return None
+        key = (endpoint.method.upper(), endpoint.path)
+        cached = self._validators.get(key)
+        if cached is not None and cached[0] == endpoint.response_schema:
+            self._validators.move_to_end(key)
+            return cached[1]
+        check = compile_schema(endpoint.response_schema)
+        self._validators[key] = (endpoint.response_schema, check)
+        self._validators.move_to_end(key)
+        while len(self._validators) > self.max_validators:
+            self._validators.popitem(last=False)
+        return check
+
+    @staticmethod
+    def build_url(base_url: str, endpoint: Endpoint, path_params: Dict[str, str]) -> str:
+        segments = []
+        for segment in split_path(endpoint.path):
+            name = path_param_name(segment)
+            if name is not None:
+                if name not in path_params:
+                    raise KeyError(name)
+                segment = quote(str(path_params[name]), safe="")
+            segments.append(segment)
+        return base_url.rstrip("/") + "/" + "/".join(segments)
+
+    async def run(
+        self,
+        schema: ApiSchema,
+        runs: int = 1,
+        concurrency: int = 10,
+        methods: Iterable[str] = ("GET",),
+        path_params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        client: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Calls every endpoint with one of the given methods `runs` times, at most
+        `concurrency` requests at a time, and returns the contract report.
+        Endpoints whose path parameters have no value in path_params are skipped.
+        Drift is flagged as new against the previous test by the same client.
+        """
+        if not schema.base_url:
+            raise ValueError("The schema has no base_url to test against")
+
+        methods = {method.upper() for method in methods}
+        path_params = path_params or {}
+        targets: List[_EndpointRuns] = []
+        skipped = []
+        for endpoint in schema.endpoints:
+            if endpoint.method.upper() not in methods:
+                continue
+            try:
+                url = self.build_url(schema.base_url, endpoint, path_params)
+            except KeyError as e:
+                skipped.append({"method": endpoint.method.upper(), "path": endpoint.path,
+                                "reason": f"No value for path parameter '{e.args[0]}'"})
+                continue
+            targets.append(_EndpointRuns(endpoint, url))
+
+        start_time = time.time()
+        http_client = self._get_client()
+        jobs = ((target, self.validator_for(target.endpoint)) for _ in range(runs) for target in targets)
+
+        async def worker():
+            # Workers pull from one shared generator, so memory stays flat however many jobs there are.
+            for target, check in jobs:
+                await self._check_once(http_client, target, check, headers)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(targets) * runs)))))
+        duration = (time.time() - start_time) * 1000
+
+        endpoints = [self._endpoint_report(schema, target, client) for target in targets]
+        logger.info(f"Contract test of {len(targets)} endpoints x {runs} runs finished in {duration:.0f} ms")
+        return {
+            "title": schema.title,
+            "runs": runs,
+            "duration_ms": round(duration, 2),
+            "summary": {
+                "endpoints": len(endpoints),
+                "compliant": sum(1 for e in endpoints if e["compliant"]),
+                "drifting": sum(1 for e in endpoints if any(d["kind"] in BREAKING_KINDS for d in e["drift"])),
+                "unreachable": sum(1 for e in endpoints if not any(code.startswith("2") for code in e["status_codes"])),
+                "skipped": len(skipped),
+            },
+            "endpoints": endpoints,
+            "skipped": skipped,
+        }
+
+    async def _check_once(self, client: "httpx.AsyncClient", target: _EndpointRuns, check: Optional[Check],
+                          headers: Optional[Dict[str, str]]) -> None:
+        target.requests += 1
+        start_time = time.time()
+        try:
+            async with client.stream(target.endpoint.method.upper(), target.url, headers=headers) as response:
+                target.status_codes[response.status_code] += 1
+                if check is not None and 200 <= response.status_code < 300:
+                    issues = await self._validate_body(response, check)
+                    target.validated += 1
+                    for issue, occurrences in issues.items():
+                        seen = target.drift.setdefault(issue, [0, 0])
+                        seen[0] += 1
+                        seen[1] += occurrences
+        except ValueError as e:
+            target.errors[f"Invalid JSON response: {e}"] += 1
+        except Exception as e:
+            target.errors[str(e) or type(e).__name__] += 1
+        finally:
+            latency = (time.time() - start_time) * 1000
+            target.latency_total += latency
+            target.latency_max = max(target.latency_max, latency)
+
+    async def _validate_body(self, response: "httpx.Response", check: Check) -> Counter:
+        content_type = response.headers.get("content-type", "")
+        if content_type and "json" not in content_type:
+            raise ValueError(f"expected JSON, got {content_type.split(';')[0]}")
+
+        length = response.headers.get("content-length")
+        if length is not None and int(length) <= self.stream_threshold:
+            body = await response.aread()
+            if not body.strip():
+                return Counter({("", "missing", check.expected, None): 1})
+            return validate_json(check, body)
+
+        validator = StreamingValidator(check)
+        received = False
+        async for chunk in response.aiter_text():
+            received = received or bool(chunk.strip())
+            validator.feed(chunk)
+        if not received:
+            return Counter({("", "missing", check.expected, None): 1})
+        return validator.close()
+
+    def _endpoint_report(self, schema: ApiSchema, target: _EndpointRuns, client: str = "") -> Dict[str, Any]:
+        method = target.endpoint.method.upper()
+        previous = set()
+        # Without a validated response (an outage, say) there is nothing to compare or remember.
+        if self.cache is not None and target.validated:
+            history_key = self.cache.make_key(client, schema.base_url, method, target.endpoint.path)
+            raw = self.cache.get("contract", history_key)
+            if raw:
+                previous = {tuple(issue) for issue in json.loads(raw)}
+            self.cache.set("contract", history_key, json.dumps([list(issue) for issue in target.drift]))
+
+        drift = [
+            {
+                "path": path or "$",
+                "kind": kind,
+                "expected": expected,
+                "actual": actual,
+                "responses": responses,
+                "occurrences": occurrences,
+                # Share of validated responses showing the drift; below 1 means it is intermittent.
+                "rate": round(responses / target.validated, 3) if target.validated else 0.0,
+                "new": (path, kind, expected, actual) not in previous,
+            }
+            for (path, kind, expected, actual), (responses, occurrences) in target.drift.items()
+        ]
+        drift.sort(key=lambda d: (d["kind"] not in BREAKING_KINDS, d["path"]))
+
+        return {
+            "method": method,
+            "path": target.endpoint.path,
+            "url": target.url,
+            "requests": target.requests,
+            "validated": target.validated,
+            "status_codes": {str(code): count for code, count in sorted(target.status_codes.items())},
+            "avg_latency_ms": round(target.latency_total / target.requests, 2) if target.requests else None,
+            "max_latency_ms": round(target.latency_max, 2),
+            "compliant": (target.requests > 0 and not target.errors
+                          and all(200 <= code < 300 for code in target.status_codes)
+                          and not any(d["kind"] in BREAKING_KINDS for d in drift)),
+            "drift": drift,
+            "errors": [{"error": error, "count": count} for error, count in target.errors.most_common(5)],
+        }
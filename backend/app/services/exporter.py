@@ -28,15 +28,21 @@ class Exporter:
 
     def convert_to_postman(self, schema: ApiSchema) -> Dict:
         """Convert API schema to Postman Collection JSON format."""
+        # Split the base URL once instead of once per endpoint
+        base_url = schema.base_url or ""
+        protocol, separator, rest = base_url.partition("://")
+        if not separator:
+            protocol, rest = "", base_url
+        host = rest.split("/") if rest else []
         item = []
         for ep in schema.endpoints:
             request = {
                 "method": ep.method,
                 "header": [{"key": "Content-Type", "value": "application/json"}],
                 "url": {
-                    "raw": f"{schema.base_url}{ep.path}",
-                    "protocol": schema.base_url.split("://")[0],
-                    "host": schema.base_url.split("://")[1].split("/"),
+                    "raw": f"{base_url}{ep.path}",
+                    "protocol": protocol,
+                    "host": list(host),
                     "path": ep.path.strip("/").split("/")
                 },
                 "description": ep.description
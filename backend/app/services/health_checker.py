@@ -1,25 +1,84 @@
-import httpx
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from urllib.parse import parse_qsl, urlsplit
+
+from app.cache import SQLiteCache
+
+if TYPE_CHECKING:
+    import httpx
+
+# Larger bodies are not worth keeping around for replay.
+MAX_RECORDED_BYTES = 256 * 1024
+# Header and parameter names containing these likely carry credentials.
+CREDENTIAL_HINTS = ("auth", "key", "token", "secret", "session", "cookie", "password", "signature")
+
+
+def recording_key(client: str, method: str, url: str) -> str:
+    """
+    Cache key of the response a client recorded for a method and URL; the query string is ignored.
+    """
+    parts = urlsplit(url)
+    return SQLiteCache.make_key(client, method.upper(), parts.netloc.lower(), parts.path.rstrip("/") or "/")
+
+
+def _is_credential(name: str) -> bool:
+    name = name.lower()
+    return any(hint in name for hint in CREDENTIAL_HINTS)
+
+
+def has_credentials(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> bool:
+    """
+    Whether a request carries credentials in its URL, query parameters or headers.
+    """
+    parts = urlsplit(url)
+    if parts.username or parts.password:
+        return True
+    names = [name for name, _ in parse_qsl(parts.query, keep_blank_values=True)]
+    names += [str(name) for name in params or ()]
+    names += [str(name) for name in headers or ()]
+    return any(_is_credential(name) for name in names)
+
 
 class HealthChecker:
-    async def check_endpoint_health(self, url: str, method: str = "GET", params: Dict = None, headers: Dict = None, body: Any = None) -> Dict[str, Any]:
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        # Shared client so connections to the same host are pooled across checks.
+        self._client: Optional["httpx.AsyncClient"] = None
+        # Healthy JSON responses are recorded here so the client's mock servers can replay them.
+        self.cache = cache
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            import httpx
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def check_endpoint_health(self, url: str, method: str = "GET", params: Dict = None, headers: Dict = None, body: Any = None,
+                                    client: Optional[str] = None) -> Dict[str, Any]:
         """
         Checks the health of an API endpoint by making a real HTTP request.
         Returns the status code, latency (ms), and a success boolean.
+        With a client id, a healthy JSON response is recorded for that client's
+        mocks, unless the request carried credentials.
         """
         start_time = time.time()
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.request(method, url, params=params, headers=headers, json=body, timeout=10.0)
-                latency = (time.time() - start_time) * 1000  # Convert to ms
-                
-                return {
-                    "status_code": response.status_code,
-                    "latency_ms": round(latency, 2),
-                    "is_healthy": 200 <= response.status_code < 300,
-                    "error": None
-                }
+            http_client = self._get_client()
+            response = await http_client.request(method, url, params=params, headers=headers, json=body, timeout=10.0)
+            latency = (time.time() - start_time) * 1000  # Convert to ms
+            if client is not None and not has_credentials(url, params, headers):
+                self._record(client, method, url, response)
+
+            return {
+                "status_code": response.status_code,
+                "latency_ms": round(latency, 2),
+                "is_healthy": 200 <= response.status_code < 300,
+                "error": None
+            }
         except Exception as e:
             latency = (time.time() - start_time) * 1000
             return {
@@ -28,3 +87,12 @@ class HealthChecker:
                 "is_healthy": False,
                 "error": str(e)
             }
+
+    def _record(self, client: str, method: str, url: str, response: "httpx.Response"):
+        if self.cache is None or not 200 <= response.status_code < 300:
+            return
+        if "json" not in response.headers.get("content-type", "") or len(response.content) > MAX_RECORDED_BYTES:
+            return
+        if "set-cookie" in response.headers:
+            return  # A response opening a session is not replayed.
+        self.cache.set("recorded", recording_key(client, method, url), response.text)
@@ -0,0 +1,271 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models import Endpoint
+
+logger = logging.getLogger(__name__)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StreamingJsonParser:
+    """
+    Incrementally parses a JSON object out of (possibly streamed) LLM output.
+
+    Anything before the first '{' (prose, ```json fences) and after the
+    top-level object is ignored. If that brace turns out not to start valid
+    JSON (e.g. prose mentioning "{curly} braces"), parsing restarts at the
+    next '{'. Objects inside a top-level "endpoints" array are validated as
+    Endpoint as soon as their closing brace arrives, and a truncated tail is
+    repaired by close().
+    """
+
+    def __init__(self, on_endpoint: Optional[Callable[[Endpoint], None]] = None):
+        self.on_endpoint = on_endpoint
+
+        # Chunks are kept as a list and only joined on close(); appending to a
+        # single string would copy the whole buffer on every chunk.
+        self._parts: List[str] = []
+        self._offset = 0
+        self._reset(None)
+
+    def _reset(self, start: Optional[int]) -> None:
+        # Scan state for a candidate object starting at `start`.
+        self.endpoints: List[Endpoint] = []
+        self.invalid_endpoints: List[str] = []
+        self.truncated = False
+        self._start = start
+        self._pos = 0
+        self._done = False
+        self._result: Optional[Dict[str, Any]] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key_parts: Optional[List[str]] = None
+        self._key_from: Optional[int] = None
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._in_endpoints = False
+        self._endpoint_parts: Optional[List[str]] = None
+        self._endpoint_from: Optional[int] = None
+        # Last position where the document can be cut and closed validly.
+        self._safe: Tuple[int, Tuple[str, ...]] = (0, ())
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def raw(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> List[Endpoint]:
+        """
+        Consumes the next chunk of model output.
+        Returns the endpoints that were completed and validated by this chunk.
+        """
+        if self._done or not chunk:
+            return []
+
+        offset = self._offset
+        self._parts.append(chunk)
+        self._offset += len(chunk)
+
+        i = 0
+        if self._start is None:
+            i = chunk.find("{")
+            if i == -1:
+                return []
+            self._start = offset + i
+
+        found, failed = self._scan(chunk, offset, i)
+        if not failed:
+            return found
+        # Not JSON after all: rescan everything from the next brace.
+        text = self.raw
+        return found + self._scan_from(text, text.find("{", self._start + 1))
+
+    def _scan_from(self, text: str, start: int) -> List[Endpoint]:
+        """
+        Restarts the scan of the whole text at `start`, moving on to the next
+        '{' each time the candidate object turns out not to be JSON.
+        """
+        completed: List[Endpoint] = []
+        while start != -1:
+            self._reset(start)
+            found, failed = self._scan(text, 0, start)
+            completed.extend(found)
+            if not failed:
+                return completed
+            start = text.find("{", start + 1)
+        self._reset(None)
+        return completed
+
+    def _scan(self, chunk: str, offset: int, i: int) -> Tuple[List[Endpoint], bool]:
+        """
+        Scans chunk from index i. Returns the completed endpoints and whether
+        the candidate object proved not to be JSON.
+        """
+        completed: List[Endpoint] = []
+        stack = self._stack
+        end = len(chunk)
+
+        while i < end:
+            ch = chunk[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_parts is not None:
+                        self._key_parts.append(chunk[self._key_from:i])
+                        self._last_string = "".join(self._key_parts)
+                        self._key_parts = None
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if len(stack) == 1:
+                    self._key_parts = []
+                    self._key_from = i + 1
+            elif ch == ":":
+                if len(stack) == 1:
+                    self._key = self._last_string
+            elif ch == ",":
+                self._safe = (offset + i, tuple(stack))
+            elif ch in "{[":
+                if ch == "[" and len(stack) == 1 and self._key == "endpoints":
+                    self._in_endpoints = True
+                elif ch == "{" and self._in_endpoints and len(stack) == 2:
+                    self._endpoint_parts = []
+                    self._endpoint_from = i
+                stack.append(ch)
+                self._safe = (offset + i + 1, tuple(stack))
+            elif ch in "}]":
+                if not stack or _CLOSERS[stack[-1]] != ch:
+                    logger.debug(f"Unbalanced '{ch}' at offset {offset + i} of LLM output; skipping to next object")
+                    return completed, True
+                stack.pop()
+                self._safe = (offset + i + 1, tuple(stack))
+                if len(stack) == 2 and self._endpoint_parts is not None:
+                    self._endpoint_parts.append(chunk[self._endpoint_from:i + 1])
+                    endpoint = self._validate_endpoint("".join(self._endpoint_parts))
+                    self._endpoint_parts = None
+                    if endpoint is not None:
+                        completed.append(endpoint)
+                elif len(stack) == 1 and ch == "]":
+                    self._in_endpoints = False
+                elif not stack:
+                    try:
+                        result = json.loads(self.raw[self._start:offset + i + 1])
+                    except json.JSONDecodeError:
+                        return completed, True
+                    if not isinstance(result, dict):
+                        return completed, True
+                    self._result = result
+                    self._done = True
+                    i += 1
+                    break
+            i += 1
+
+        # Carry partially received keys and endpoints over to the next chunk.
+        if self._key_parts is not None:
+            self._key_parts.append(chunk[self._key_from:i])
+            self._key_from = 0
+        if self._endpoint_parts is not None:
+            self._endpoint_parts.append(chunk[self._endpoint_from:i])
+            self._endpoint_from = 0
+
+        self._pos = offset + i
+        return completed, False
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finishes parsing and returns the top-level object as a dict.
+        If the output was cut off, the tail is repaired and `truncated` is set.
+        A ```json fenced block is preferred over braces in the prose before it.
+        """
+        text = self.raw
+        fence = text.find("```json")
+        fenced_start = text.find("{", fence) if fence != -1 else -1
+        if self._start is not None and fenced_start > self._start:
+            start, done = self._start, self._done
+            self._scan_from(text, fenced_start)
+            if done and not self._done:
+                # The fenced block is broken; the earlier object was complete.
+                self._scan_from(text, start)
+
+        while True:
+            if self._start is None:
+                raise ValueError("No JSON object found in LLM output")
+            try:
+                return self._close_candidate(text)
+            except ValueError:
+                next_start = text.find("{", self._start + 1)
+                if next_start == -1:
+                    raise
+                self._scan_from(text, next_start)
+
+    def _close_candidate(self, text: str) -> Dict[str, Any]:
+        if self._done:
+            return self._result
+
+        self.truncated = True
+        if self._endpoint_parts is not None:
+            self.invalid_endpoints.append("".join(self._endpoint_parts))
+            self._endpoint_parts = None
+
+        # First try closing everything where the text stopped, then fall back
+        # to the last point where a complete value ended.
+        body = text[self._start:self._pos]
+        if self._escape:
+            body = body[:-1]
+        if self._in_string:
+            body += '"'
+        candidates = [body + self._closers(self._stack)]
+        safe_pos, safe_stack = self._safe
+        if safe_pos > self._start:
+            candidates.append(text[self._start:safe_pos] + self._closers(safe_stack))
+
+        for candidate in candidates:
+            try:
+                result = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, dict):
+                return result
+        raise ValueError("Could not repair truncated LLM output")
+
+    def _validate_endpoint(self, raw: str) -> Optional[Endpoint]:
+        try:
+            endpoint = Endpoint(**json.loads(raw))
+        except (json.JSONDecodeError, ValidationError, TypeError) as e:
+            logger.warning(f"Discarding invalid endpoint from LLM output: {e}")
+            self.invalid_endpoints.append(raw)
+            return None
+
+        self.endpoints.append(endpoint)
+        if self.on_endpoint:
+            self.on_endpoint(endpoint)
+        return endpoint
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def parse_llm_json(text: str) -> Dict[str, Any]:
+    """
+    Parses a complete LLM response, tolerating surrounding prose, code fences
+    and a truncated tail.
+    """
+    parser = StreamingJsonParser()
+    parser.feed(text)
+    return parser.close()
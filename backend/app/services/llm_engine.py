@@ -1,29 +1,46 @@
 import os
-import json
 import logging
-from typing import Optional, Dict, Any
-import google.generativeai as genai
-from openai import OpenAI
-from app.models import ApiSchema
+from typing import Optional, Dict, Any, List
+from pydantic import ValidationError
+from app.cache import SQLiteCache
+from app.models import ApiSchema, Endpoint
+from app.rate_limit import charge_llm_tokens
+from app.services.json_stream import StreamingJsonParser
 
 logger = logging.getLogger(__name__)
 
 class LLMEngine:
-    def __init__(self):
+    # Follow-up requests for endpoints lost to truncation or invalid output.
+    max_repair_rounds = 1
+
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        self.cache = cache
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         
+        # The SDKs are imported only for configured providers; together they
+        # take about a second to import.
         if self.gemini_api_key:
+            import google.generativeai as genai
             genai.configure(api_key=self.gemini_api_key)
             self.gemini_model = genai.GenerativeModel('gemini-2.0-flash')
         
         if self.openai_api_key:
+            from openai import OpenAI
             self.openai_client = OpenAI(api_key=self.openai_api_key)
 
     async def parse_documentation(self, text_content: str, provider: str = "gemini") -> ApiSchema:
         """
         Parses raw text documentation into a structured ApiSchema using an LLM.
+        Results are cached by provider and document text when a cache is configured.
         """
+        cache_key = SQLiteCache.make_key(provider, text_content[:30000])
+        if self.cache:
+            cached = self.cache.get("parse", cache_key)
+            if cached is not None:
+                logger.info("Using cached parse result")
+                return ApiSchema.model_validate_json(cached)
+
         prompt = f"""
         You are an expert API documentation parser. Your task is to extract structured API information from the following raw text.
         
@@ -54,34 +71,117 @@ class LLMEngine:
         }}
         """
 
+        parser = StreamingJsonParser()
         try:
-            if provider == "gemini" and self.gemini_api_key:
-                logger.info("Using Gemini for parsing")
-                response = self.gemini_model.generate_content(prompt)
-                json_str = response.text.replace("```json", "").replace("```", "").strip()
-                data = json.loads(json_str)
-                return ApiSchema(**data)
-            
-            elif provider == "openai" and self.openai_api_key:
-                logger.info("Using OpenAI for parsing")
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant that parses API documentation."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                json_str = response.choices[0].message.content
-                data = json.loads(json_str)
-                return ApiSchema(**data)
-            
-            else:
-                raise ValueError("Selected provider not available or API key missing.")
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON. Raw response: {json_str}")
-            raise ValueError(f"LLM returned invalid JSON: {e}")
+            await self._stream_completion(prompt, provider, parser)
         except Exception as e:
             logger.error(f"Error extracting schema with LLM: {e}")
             raise
+
+        try:
+            data = parser.close()
+        except ValueError as e:
+            logger.error(f"Failed to parse LLM response as JSON. Raw response: {parser.raw}")
+            raise ValueError(f"LLM returned invalid JSON: {e}")
+
+        raw = parser.raw
+        endpoints = list(parser.endpoints)
+        complete = not parser.truncated and not parser.invalid_endpoints
+        for _ in range(self.max_repair_rounds):
+            if complete:
+                break
+            logger.warning(
+                f"LLM output incomplete ({len(parser.invalid_endpoints)} invalid endpoints, "
+                f"truncated={parser.truncated}); requesting missing endpoints only"
+            )
+            parser = StreamingJsonParser()
+            try:
+                await self._stream_completion(
+                    self._build_missing_endpoints_prompt(text_content, endpoints), provider, parser
+                )
+                parser.close()
+            except Exception as e:
+                logger.error(f"Error requesting missing endpoints: {e}")
+                break
+            endpoints = self._merge_endpoints(endpoints, parser.endpoints)
+            complete = not parser.truncated and not parser.invalid_endpoints
+
+        data["endpoints"] = endpoints
+        try:
+            schema = ApiSchema(**data)
+        except ValidationError as e:
+            # Truncation can cut off top-level fields such as the title.
+            logger.error(f"LLM response is missing required fields. Raw response: {raw}")
+            raise ValueError(f"LLM returned invalid JSON: {e}")
+        # An incomplete result is returned but not cached, so the next call retries the model.
+        if self.cache and complete:
+            self.cache.set("parse", cache_key, schema.model_dump_json())
+        return schema
+
+    async def _stream_completion(self, prompt: str, provider: str, parser: StreamingJsonParser) -> None:
+        """
+        Streams the model output for the prompt into the parser chunk by chunk.
+        """
+        charge_llm_tokens(prompt)
+        if provider == "gemini" and self.gemini_api_key:
+            logger.info("Using Gemini for parsing")
+            response = await self.gemini_model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                parser.feed(chunk.text)
+
+        elif provider == "openai" and self.openai_api_key:
+            logger.info("Using OpenAI for parsing")
+            stream = self.openai_client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that parses API documentation."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parser.feed(chunk.choices[0].delta.content)
+
+        else:
+            raise ValueError("Selected provider not available or API key missing.")
+
+    def _build_missing_endpoints_prompt(self, text_content: str, endpoints: List[Endpoint]) -> str:
+        """
+        Builds a follow-up prompt that asks only for endpoints not yet extracted.
+        """
+        known = "\n".join(f"{ep.method} {ep.path}" for ep in endpoints) or "(none)"
+        return f"""
+        You previously extracted API endpoints from the raw text below, but the output was cut off or malformed.
+
+        Raw Text:
+        {text_content[:30000]}
+
+        Endpoints already extracted (do NOT repeat these):
+        {known}
+
+        Return a strict JSON object containing ONLY the remaining endpoints (do not include markdown code blocks):
+        {{
+            "endpoints": [
+                {{
+                    "path": "/endpoint",
+                    "method": "GET",
+                    "description": "Endpoint description",
+                    "parameters": [],
+                    "response_schema": {{ "key": "value" }}
+                }}
+            ]
+        }}
+        """
+
+    @staticmethod
+    def _merge_endpoints(existing: List[Endpoint], new: List[Endpoint]) -> List[Endpoint]:
+        seen = {(ep.method.upper(), ep.path) for ep in existing}
+        merged = list(existing)
+        for ep in new:
+            key = (ep.method.upper(), ep.path)
+            if key not in seen:
+                seen.add(key)
+                merged.append(ep)
+        return merged
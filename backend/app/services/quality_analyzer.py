@@ -1,6 +1,6 @@
 from app.models import ApiSchema
-import google.generativeai as genai
-import json
+from app.rate_limit import charge_llm_tokens
+from app.services.json_stream import parse_llm_json
 import os
 from typing import Dict, Any, List
 
@@ -14,6 +14,7 @@ class QualityAnalyzer:
         Analyzes the quality of the API documentation based on the schema.
         Scores based on completeness, descriptions, and authentication details.
         """
+        import google.generativeai as genai  # deferred: slow to import
         model = genai.GenerativeModel('gemini-pro')
         
         prompt = f"""
@@ -38,11 +39,12 @@ class QualityAnalyzer:
         
         Do not include markdown formatting like ```json ... ```. Just the raw JSON string.
         """
-        
+
+        # Outside the try: an exhausted budget must surface as 429, not a score of 0.
+        charge_llm_tokens(prompt)
         try:
             response = await model.generate_content_async(prompt)
-            text = response.text.strip().replace('```json', '').replace('```', '')
-            return json.loads(text)
+            return parse_llm_json(response.text)
         except Exception as e:
             print(f"Error in quality analysis: {e}")
             return {
@@ -0,0 +1,440 @@
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+_raw_decode = json.JSONDecoder().raw_decode
+
+# (path, kind, expected, actual), e.g. ("data[].id", "type", "integer", "string").
+# kind is one of "type", "missing", "unexpected" or "enum"; "" is the document root.
+Issue = Tuple[str, str, Optional[str], Optional[str]]
+
+JSON_TYPES = ("string", "integer", "number", "boolean", "object", "array", "null")
+
+# Type names as they show up in parsed docs, mapped to JSON types.
+_TYPE_ALIASES = {
+    "string": "string", "str": "string", "text": "string",
+    "date": "string", "datetime": "string", "uuid": "string", "url": "string", "email": "string",
+    "integer": "integer", "int": "integer", "long": "integer",
+    "number": "number", "float": "number", "double": "number", "decimal": "number",
+    "boolean": "boolean", "bool": "boolean",
+    "object": "object", "dict": "object", "map": "object",
+    "array": "array", "list": "array",
+    "null": "null", "any": "any",
+}
+
+# Keywords of the JSON Schema subset we understand; a dict made only of these is a schema, not a shape.
+_SCHEMA_KEYWORDS = frozenset({
+    "type", "properties", "required", "items", "enum", "nullable", "additionalProperties",
+    "description", "title", "format", "example", "examples", "default", "pattern",
+    "minimum", "maximum", "minLength", "maxLength", "minItems", "maxItems", "$schema",
+})
+
+# A type name, optionally with a note: "string", "integer (unix time)", "string | null".
+_TYPE_NAME = re.compile(r"^\s*([a-zA-Z]+(?:\s*\|\s*[a-zA-Z]+)*)\s*(?:\(.*\))?\s*$")
+
+
+def json_type(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, list):
+        return "array"
+    return "object"
+
+
+def _join(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+class Check:
+    """
+    Compiled validator for one position in a response document.
+    Problems are counted into an issues Counter instead of raised, so a body
+    with many violations is checked in one pass.
+    """
+
+    __slots__ = ("types", "enum", "expected")
+
+    def __init__(self, types: FrozenSet[str], enum: Optional[FrozenSet[Any]] = None):
+        self.types = types
+        self.enum = enum
+        self.expected = "|".join(sorted(types))
+
+    def accepts(self, actual: str) -> bool:
+        return "any" in self.types or actual in self.types or (actual == "integer" and "number" in self.types)
+
+    def check(self, value: Any, path: str, issues: Counter) -> None:
+        actual = json_type(value)
+        if not self.accepts(actual):
+            issues[(path, "type", self.expected, actual)] += 1
+        elif self.enum is not None and actual not in ("object", "array") and value not in self.enum:
+            issues[(path, "enum", self.expected, str(value)[:80])] += 1
+
+
+class ObjectCheck(Check):
+    __slots__ = ("properties", "required", "report_unexpected")
+
+    def __init__(self, types: FrozenSet[str], properties: Dict[str, Check], required: FrozenSet[str],
+                 report_unexpected: bool):
+        super().__init__(types)
+        self.properties = properties
+        self.required = required
+        self.report_unexpected = report_unexpected
+
+    def check(self, value: Any, path: str, issues: Counter) -> None:
+        if not isinstance(value, dict):
+            super().check(value, path, issues)
+            return
+        properties = self.properties
+        for key, check in properties.items():
+            if key in value:
+                check.check(value[key], _join(path, key), issues)
+            elif key in self.required:
+                issues[(_join(path, key), "missing", check.expected, None)] += 1
+        if self.report_unexpected:
+            for key in value:
+                if key not in properties:
+                    issues[(_join(path, key), "unexpected", None, None)] += 1
+
+    def check_key(self, key: str, path: str, issues: Counter) -> Optional[Check]:
+        """
+        Returns the check for one member of a streamed object, reporting it if unexpected.
+        """
+        check = self.properties.get(key)
+        if check is None and self.report_unexpected:
+            issues[(_join(path, key), "unexpected", None, None)] += 1
+        return check
+
+    def check_missing(self, seen: set, path: str, issues: Counter) -> None:
+        for key in self.required:
+            if key not in seen:
+                issues[(_join(path, key), "missing", self.properties[key].expected, None)] += 1
+
+
+class ArrayCheck(Check):
+    __slots__ = ("items",)
+
+    def __init__(self, types: FrozenSet[str], items: Optional[Check]):
+        super().__init__(types)
+        self.items = items
+
+    def check(self, value: Any, path: str, issues: Counter) -> None:
+        if not isinstance(value, list):
+            super().check(value, path, issues)
+            return
+        items = self.items
+        if items is not None:
+            item_path = f"{path}[]"
+            for item in value:
+                items.check(item, item_path, issues)
+
+
+ANY = Check(frozenset({"any"}))
+
+
+def type_names(text: str) -> Optional[FrozenSet[str]]:
+    match = _TYPE_NAME.match(text)
+    if not match:
+        return None
+    names = [_TYPE_ALIASES.get(name.strip().lower()) for name in match.group(1).split("|")]
+    if None in names:
+        return None
+    return frozenset(names)
+
+
+def is_json_schema(value: Any) -> bool:
+    if not isinstance(value, dict) or not value or not set(value) <= _SCHEMA_KEYWORDS:
+        return False
+    declared = value.get("type")
+    if isinstance(declared, str):
+        declared = [declared]
+    if isinstance(declared, list):
+        return all(isinstance(name, str) and name in JSON_TYPES for name in declared)
+    return isinstance(value.get("properties"), dict) or isinstance(value.get("items"), dict)
+
+
+def compile_schema(schema: Any) -> Check:
+    """
+    Compiles an endpoint's response_schema into a Check tree.
+
+    Two forms are understood: a subset of JSON Schema (type, properties,
+    required, items, enum, nullable) and the example-shaped objects the LLM
+    usually extracts, e.g. {"id": "integer", "tags": ["string"], "name": "Rex"},
+    where strings name a type or are example values and every field is expected.
+    """
+    if is_json_schema(schema):
+        return _compile_json_schema(schema)
+    if isinstance(schema, dict):
+        properties = {key: compile_schema(value) for key, value in schema.items()}
+        return ObjectCheck(frozenset({"object"}), properties, frozenset(properties), bool(properties))
+    if isinstance(schema, list):
+        return ArrayCheck(frozenset({"array"}), compile_schema(schema[0]) if schema else None)
+    if isinstance(schema, str):
+        return Check(type_names(schema) or frozenset({"string"}))
+    if schema is None:
+        return ANY
+    return Check(frozenset({json_type(schema)}))
+
+
+def _compile_json_schema(schema: Dict[str, Any]) -> Check:
+    declared = schema.get("type")
+    types = {declared} if isinstance(declared, str) else set(declared or ())
+    if "properties" in schema:
+        types.add("object")
+    if "items" in schema:
+        types.add("array")
+    if not types:
+        types.add("any")
+    if schema.get("nullable"):
+        types.add("null")
+    types = frozenset(types)
+
+    if "object" in types:
+        properties = {key: compile_schema(value) for key, value in (schema.get("properties") or {}).items()}
+        required = frozenset(key for key in schema.get("required", ()) if key in properties)
+        # Extra fields are drift worth reporting unless the schema says what they may be.
+        return ObjectCheck(types, properties, required, bool(properties) and "additionalProperties" not in schema)
+    if "array" in types:
+        items = schema.get("items")
+        return ArrayCheck(types, compile_schema(items) if isinstance(items, dict) else None)
+
+    enum = schema.get("enum")
+    if isinstance(enum, list):
+        hashable = [value for value in enum if not isinstance(value, (dict, list))]
+        return Check(types, frozenset(hashable))
+    return Check(types)
+
+
+def validate(check: Check, value: Any) -> Counter:
+    issues: Counter = Counter()
+    check.check(value, "", issues)
+    return issues
+
+
+def validate_json(check: Check, text: Any) -> Counter:
+    """
+    Decodes a complete JSON body (str or bytes) and validates it.
+    """
+    return validate(check, _loads(text))
+
+
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+
+
+class _Frame:
+    __slots__ = ("kind", "check", "path", "seen", "count")
+
+    def __init__(self, kind: str, check: Optional[Check], path: str):
+        self.kind = kind
+        self.check = check
+        self.path = path
+        self.seen = set() if kind == "{" else None
+        self.count = 0
+
+
+class StreamingValidator:
+    """
+    Validates a JSON document fed in chunks without holding all of it.
+
+    The root container and arrays directly inside it are walked incrementally;
+    every other value (an element of a large list, a member of the root
+    object) is decoded and checked on its own as soon as it is complete, so
+    memory is bounded by the largest single element rather than the body.
+    Malformed or truncated JSON raises ValueError.
+    """
+
+    def __init__(self, check: Check):
+        self.check = check
+        self.issues: Counter = Counter()
+        self._frames: List[_Frame] = []
+        self._expect = "value"
+        self._key: Optional[str] = None
+        self._capture: Optional[List[str]] = None
+        self._capture_kind = ""
+        self._capture_is_key = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> None:
+        i = 0
+        n = len(chunk)
+        while i < n:
+            if self._capture is not None:
+                i = self._scan_capture(chunk, i)
+                continue
+            c = chunk[i]
+            if c in " \t\r\n\ufeff":
+                i += 1
+                continue
+            expect = self._expect
+            frame = self._frames[-1] if self._frames else None
+
+            if expect == "value":
+                if c in "{[" and (frame is None or (len(self._frames) == 1 and c == "[")):
+                    self._open(c)
+                elif c == "]" and frame is not None and frame.kind == "[" and frame.count == 0:
+                    self._close()
+                elif c in ",:]}":
+                    raise ValueError(f"Unexpected '{c}' where a value was expected")
+                elif c in '{["':
+                    i = self._decode(chunk, i, is_key=False)
+                    continue
+                else:
+                    self._start_capture("scalar", is_key=False)
+                    continue
+            elif expect == "key":
+                if c == '"':
+                    i = self._decode(chunk, i, is_key=True)
+                    continue
+                if c == "}" and frame.count == 0:
+                    self._close()
+                else:
+                    raise ValueError(f"Unexpected '{c}' where an object key was expected")
+            elif expect == "colon":
+                if c != ":":
+                    raise ValueError(f"Unexpected '{c}' where ':' was expected")
+                self._expect = "value"
+            elif expect == "separator":
+                if c == ",":
+                    self._expect = "key" if frame.kind == "{" else "value"
+                elif c == ("}" if frame.kind == "{" else "]"):
+                    self._close()
+                else:
+                    raise ValueError(f"Unexpected '{c}' after a value")
+            else:
+                raise ValueError("Unexpected data after the end of the document")
+            i += 1
+
+    def close(self) -> Counter:
+        """
+        Finishes the document and returns the issues found, counted per (path, kind, expected, actual).
+        """
+        if self._capture is not None and self._capture_kind == "scalar":
+            self._complete_capture()
+        if self._capture is not None or self._frames or self._expect != "end":
+            raise ValueError("Truncated JSON document")
+        return self.issues
+
+    def _slot(self) -> Tuple[Optional[Check], str]:
+        # Check and path for the value that is starting or just completed.
+        if not self._frames:
+            return self.check, ""
+        frame = self._frames[-1]
+        frame.count += 1
+        check = frame.check
+        if frame.kind == "[":
+            return (check.items if isinstance(check, ArrayCheck) else None), f"{frame.path}[]"
+        key, self._key = self._key, None
+        frame.seen.add(key)
+        if isinstance(check, ObjectCheck):
+            return check.check_key(key, frame.path, self.issues), _join(frame.path, key)
+        return None, _join(frame.path, key)
+
+    def _open(self, c: str) -> None:
+        check, path = self._slot()
+        actual = "object" if c == "{" else "array"
+        if check is not None and not check.accepts(actual):
+            self.issues[(path, "type", check.expected, actual)] += 1
+            check = None
+        self._frames.append(_Frame(c, check, path))
+        self._expect = "key" if c == "{" else "value"
+
+    def _close(self) -> None:
+        frame = self._frames.pop()
+        if isinstance(frame.check, ObjectCheck):
+            frame.check.check_missing(frame.seen, frame.path, self.issues)
+        self._expect = "separator" if self._frames else "end"
+
+    def _decode(self, chunk: str, i: int, is_key: bool) -> int:
+        # Fast path: most elements lie within one chunk and decode in C. Those
+        # cut off by the chunk boundary (or malformed) go through the scanner.
+        try:
+            value, end = _raw_decode(chunk, i)
+        except ValueError:
+            self._start_capture("tree", is_key)
+            return i
+        self._accept(value, is_key)
+        return end
+
+    def _start_capture(self, kind: str, is_key: bool) -> None:
+        self._capture = []
+        self._capture_kind = kind
+        self._capture_is_key = is_key
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _scan_capture(self, chunk: str, i: int) -> int:
+        n = len(chunk)
+        start = i
+        if self._capture_kind == "scalar":
+            match = _SCALAR_END.search(chunk, i)
+            if match is None:
+                self._capture.append(chunk[start:])
+                return n
+            self._capture.append(chunk[start:match.start()])
+            self._complete_capture()
+            return match.start()
+
+        while i < n:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_END.search(chunk, i)
+                if match is None:
+                    break
+                i = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                    continue
+                self._in_string = False
+            else:
+                match = _STRUCTURAL.search(chunk, i)
+                if match is None:
+                    break
+                i = match.end()
+                c = match.group()
+                if c == '"':
+                    self._in_string = True
+                    continue
+                self._depth += 1 if c in "{[" else -1
+            if self._depth == 0:
+                self._capture.append(chunk[start:i])
+                self._complete_capture()
+                return i
+        self._capture.append(chunk[start:])
+        return n
+
+    def _complete_capture(self) -> None:
+        text = "".join(self._capture)
+        self._capture = None
+        self._accept(_loads(text), self._capture_is_key)
+
+    def _accept(self, value: Any, is_key: bool) -> None:
+        if is_key:
+            self._key = value
+            self._expect = "colon"
+            return
+        check, path = self._slot()
+        if check is not None:
+            check.check(value, path, self.issues)
+        self._expect = "separator" if self._frames else "end"
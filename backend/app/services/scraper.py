@@ -1,31 +1,65 @@
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+import asyncio
+from typing import Optional, TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Playwright
+
 logger = logging.getLogger(__name__)
 
 class ScraperService:
+    def __init__(self, max_pages: int = 4):
+        # One Chromium per worker, launched on first use and shared by all
+        # requests; each page gets its own isolated browser context.
+        self._playwright: Optional["Playwright"] = None
+        self._browser: Optional["Browser"] = None
+        self._launch_lock = asyncio.Lock()
+        self._pages = asyncio.Semaphore(max_pages)
+
+    async def _get_browser(self) -> "Browser":
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            return self._browser
+
     async def fetch_page_content(self, url: str) -> str:
         """
         Fetches the raw HTML content of a page using Playwright to handle dynamic content.
         """
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
-                logger.info(f"Navigating to {url}")
-                await page.goto(url, wait_until="networkidle", timeout=60000)
-                content = await page.content()
-                await browser.close()
-                return content
+            async with self._pages:
+                browser = await self._get_browser()
+                context = await browser.new_context()
+                try:
+                    page = await context.new_page()
+                    logger.info(f"Navigating to {url}")
+                    await page.goto(url, wait_until="networkidle", timeout=60000)
+                    return await page.content()
+                finally:
+                    await context.close()
         except Exception as e:
             logger.error(f"Error fetching page: {e}")
             raise
 
+    async def close(self):
+        """
+        Shuts down the shared browser and the Playwright driver.
+        """
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
     def extract_text(self, html_content: str) -> str:
         """
         Extracts readable text from HTML content using BeautifulSoup.
         """
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # Remove script and style elements
@@ -1,22 +1,31 @@
+from app.cache import SQLiteCache
 from app.models import ApiSchema
-import google.generativeai as genai
+from app.rate_limit import charge_llm_tokens
+from app.services.json_stream import parse_llm_json
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 class SemanticMapper:
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[SQLiteCache] = None):
+        self.cache = cache
 
     async def map_query_to_endpoint(self, schema: ApiSchema, query: str) -> Dict[str, Any]:
         """
         Finds the best matching endpoint for a natural language query.
         """
+        import google.generativeai as genai  # deferred: slow to import
         model = genai.GenerativeModel('gemini-pro')
         
         # Simplify schema for prompt to save tokens
         endpoints_summary = []
         for ep in schema.endpoints:
             endpoints_summary.append(f"{ep.method} {ep.path}: {ep.description}")
+
+        cache_key = SQLiteCache.make_key(json.dumps(endpoints_summary), query)
+        if self.cache:
+            cached = self.cache.get("semantic", cache_key)
+            if cached is not None:
+                return json.loads(cached)
         
         prompt = f"""
         Given the following API endpoints and a user query, identify the single best matching endpoint.
@@ -36,11 +45,14 @@ class SemanticMapper:
         If no endpoint matches well, return null for method and path.
         Do not include markdown formatting.
         """
-        
+
+        charge_llm_tokens(prompt)
         try:
             response = await model.generate_content_async(prompt)
-            text = response.text.strip().replace('```json', '').replace('```', '')
-            return json.loads(text)
+            result = parse_llm_json(response.text)
+            if self.cache:
+                self.cache.set("semantic", cache_key, json.dumps(result))
+            return result
         except Exception as e:
             print(f"Error in semantic mapping: {e}")
             return {"method": None, "path": None, "reasoning": "Error processing query"}
@@ -0,0 +1,38 @@
+import socket
+import sys
+from typing import Any, Dict, List
+
+# Sockets handed to uvicorn by fd; kept referenced since collecting one closes it.
+_listening: List[socket.socket] = []
+
+
+def bind_tcp_socket(host: str, port: int) -> socket.socket:
+    """
+    Binds the listening socket for a multi-worker uvicorn server, to be passed
+    as fd=sock.fileno().
+
+    uvicorn binds its own socket with protocol 0 when it runs several workers,
+    so asyncio does not enable TCP_NODELAY on the accepted connections, and
+    since headers and body are written separately, Nagle's algorithm holds
+    the body back until the client's delayed ACK (~40 ms per keep-alive
+    response). Accepted connections inherit TCP_NODELAY from this socket.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def listen_options(host: str, port: int, workers: int) -> Dict[str, Any]:
+    """
+    Returns the uvicorn.run() keyword arguments for where to listen: an fd
+    from bind_tcp_socket() when running several workers, host and port otherwise.
+    """
+    if workers > 1 and sys.platform != 'win32':
+        sock = bind_tcp_socket(host, port)
+        _listening.append(sock)
+        return {"fd": sock.fileno()}
+    return {"host": host, "port": port}
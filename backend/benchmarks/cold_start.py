@@ -0,0 +1,109 @@
+"""
+Cold start measurements for the backend.
+
+Each measurement runs in a fresh interpreter, as a new uvicorn worker or a
+scaled-out instance would.
+
+Usage (from backend/):
+    python -m benchmarks.cold_start            # import profile and time to first request
+    python -m benchmarks.cold_start --top 30
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+# Runs in the child process: import the app, start the worker and serve one
+# request in-process, reporting how long each step took.
+_FIRST_REQUEST_SCRIPT = """
+import asyncio, json, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import httpx
+import main
+imported = time.perf_counter()
+
+async def first_request():
+    body = json.dumps({"title": "Cold start", "base_url": "https://api.example.com", "endpoints": []})
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+            response = await client.post(ROUTE, content=body, headers={"Content-Type": "application/json"})
+            response.raise_for_status()
+
+asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_request_ms": (done - imported) * 1000}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["CACHE_PATH"] = ":memory:"
+    env["PYTHONWARNINGS"] = "ignore"
+    return env
+
+
+def import_profile(module: str = "main") -> List[Tuple[str, float]]:
+    """
+    Imports module in a fresh interpreter with -X importtime and returns the
+    self time in ms per top-level package, slowest first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True, check=True,
+    )
+    totals: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            totals[match.group(4).split(".")[0]] += int(match.group(1)) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def measure_cold_start(route: str = "/api/export-markdown") -> Dict[str, float]:
+    """
+    Starts a fresh interpreter, imports the app and serves one request.
+    Returns the app import time, lifespan plus first request time, and the
+    wall time from process launch to the response.
+    """
+    script = _FIRST_REQUEST_SCRIPT.replace("ROUTE", repr(route))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR, env=_child_env(), capture_output=True, text=True, check=True,
+    )
+    total_ms = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_total_ms"] = total_ms
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile and cold start of the backend")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to list")
+    parser.add_argument("--route", default="/api/export-markdown", help="Route served as the first request")
+    args = parser.parse_args()
+
+    profile = import_profile()
+    print(f"Import profile of main ({sum(ms for _, ms in profile):.0f} ms total self time):")
+    for package, ms in profile[:args.top]:
+        print(f"  {package:<30} {ms:>8.1f} ms")
+
+    timings = measure_cold_start(args.route)
+    print(f"Cold start to first {args.route} response:")
+    for key, value in timings.items():
+        print(f"  {key:<30} {value:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
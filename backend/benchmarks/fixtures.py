@@ -0,0 +1,93 @@
+import os
+from types import SimpleNamespace
+from typing import List
+
+from app.models import ApiSchema, Endpoint, Parameter
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_endpoint(i: int) -> Endpoint:
+    """
+    Builds a deterministic endpoint resembling what the LLM extracts from real docs.
+    """
+    method = METHODS[i % len(METHODS)]
+    group = i // 50
+    parameters = [
+        Parameter(name="item_id", type="integer", required=True, description="Identifier of the item"),
+        Parameter(name="fields", type="string", required=False, description="Comma separated fields to return"),
+    ]
+    if method != "GET":
+        parameters.append(Parameter(name="payload", type="object", required=True, description="Request body"))
+    return Endpoint(
+        path=f"/resources/{group}/items/{{item_id}}/action{i}",
+        method=method,
+        description=f"Performs action {i} on an item of resource group {group}.",
+        parameters=parameters,
+        response_schema={"id": "integer", "name": "string", "tags": ["string"], "meta": {"created": "string"}},
+    )
+
+
+def make_schema(n: int) -> ApiSchema:
+    return ApiSchema(
+        title=f"Synthetic API ({n} endpoints)",
+        description="Synthetic schema used by the benchmark suite.",
+        base_url="https://api.example.com/v1",
+        endpoints=[make_endpoint(i) for i in range(n)],
+    )
+
+
+def make_docs_html(n: int) -> str:
+    """
+    Scales the recorded documentation page so it describes roughly n endpoints.
+    """
+    page = load_fixture("docs_page.html")
+    first = page.index('<div class="endpoint">')
+    last = page.index("<footer>")
+    sections = page[first:last]
+    copies = max(1, n // sections.count('<div class="endpoint">'))
+    return page[:first] + sections * copies + page[last:]
+
+
+def recorded_parse_response(n: int) -> str:
+    """
+    LLM output for /api/parse as the model returns it: fenced, with a short preamble.
+    """
+    return "Here is the extracted schema:\n```json\n" + make_schema(n).model_dump_json(indent=2) + "\n```\n"
+
+
+class RecordedModel:
+    """
+    Stands in for google.generativeai.GenerativeModel and replays a recorded response.
+    Streamed responses are split into chunks of roughly the size Gemini emits.
+    """
+
+    chunk_size = 512
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        if stream:
+            return [SimpleNamespace(text=chunk) for chunk in self._chunks()]
+        return SimpleNamespace(text=self.text)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        if not stream:
+            return SimpleNamespace(text=self.text)
+
+        async def chunks():
+            for chunk in self._chunks():
+                yield SimpleNamespace(text=chunk)
+
+        return chunks()
+
+    def _chunks(self) -> List[str]:
+        return [self.text[i:i + self.chunk_size] for i in range(0, len(self.text), self.chunk_size)]
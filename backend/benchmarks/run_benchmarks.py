@@ -0,0 +1,283 @@
+"""
+Offline benchmark suite for the backend services and API routes.
+
+LLM calls are replayed from recorded fixtures, the scraper returns a recorded
+documentation page and health checks hit a local stub server, so runs are
+repeatable without network access or API keys.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmarks                   # compare against baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline   # record a new baseline
+    python -m benchmarks.run_benchmarks --sizes 10 1000 --only export
+
+Baselines are machine specific: record one on the machine that runs the
+comparison, and raise --tolerance on noisy shared hosts.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict, List
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import (
+    load_fixture,
+    make_docs_html,
+    make_schema,
+    recorded_parse_response,
+    RecordedModel,
+)
+from benchmarks.cold_start import import_profile, measure_cold_start
+from benchmarks.stub_server import StubServer
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = [10, 1000, 10000]
+
+
+def _time_sync(fn: Callable, repeat: int) -> float:
+    fn()  # warm up caches, lazy imports and first-call paths
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+async def _time_async(fn: Callable, repeat: int) -> float:
+    await fn()
+    gc.collect()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def service_cases(size: int) -> Dict[str, Callable]:
+    from app.endpoint_index import EndpointIndex
+    from app.models import ApiSchema
+    from app.services.code_generator import CodeGenerator
+    from app.services.exporter import Exporter
+    from app.services.json_stream import StreamingJsonParser
+    from app.services.scraper import ScraperService
+
+    schema = make_schema(size)
+    payload = schema.model_dump_json()
+    html = make_docs_html(size)
+    llm_output = recorded_parse_response(size)
+    code_generator = CodeGenerator()
+    exporter = Exporter()
+    scraper = ScraperService()
+    index = EndpointIndex.from_schema(schema)
+    # Concrete URLs for every tenth endpoint, with the path parameters filled in.
+    urls = [
+        (endpoint.method, schema.base_url + endpoint.path.replace("{item_id}", str(i)))
+        for i, endpoint in enumerate(schema.endpoints[::10])
+    ]
+
+    def generate_snippets():
+        for endpoint in schema.endpoints:
+            for language in ("python", "javascript", "curl"):
+                code_generator.generate_snippet(endpoint, schema.base_url, language)
+
+    def parse_llm_output():
+        parser = StreamingJsonParser()
+        for i in range(0, len(llm_output), RecordedModel.chunk_size):
+            parser.feed(llm_output[i:i + RecordedModel.chunk_size])
+        parser.close()
+
+    def match_urls():
+        for method, url in urls:
+            index.match(method, url)
+
+    return {
+        "extract_text": lambda: scraper.extract_text(html),
+        "generate_python_sdk": lambda: code_generator.generate_python_sdk(schema),
+        "generate_snippet": generate_snippets,
+        "convert_to_markdown": lambda: exporter.convert_to_markdown(schema),
+        "convert_to_postman": lambda: exporter.convert_to_postman(schema),
+        "validate_schema": lambda: ApiSchema(**json.loads(payload)),
+        "parse_llm_output": parse_llm_output,
+        "build_endpoint_index": lambda: EndpointIndex.from_schema(schema),
+        "match_endpoint_urls": match_urls,
+    }
+
+
+async def run_route_cases(sizes: List[int], repeat: int, selected: Callable[[str], bool]) -> Dict[str, float]:
+    os.environ["CACHE_PATH"] = ":memory:"
+    # Repeated requests from one client would otherwise trip the rate limits.
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    import main
+
+    # ASGITransport does not run the lifespan hook, so start the services here.
+    async with main.app.router.lifespan_context(main.app):
+        return await _run_route_cases(main.app, main.services, sizes, repeat, selected)
+
+
+async def _run_route_cases(app, services, sizes: List[int], repeat: int, selected: Callable[[str], bool]) -> Dict[str, float]:
+    import httpx
+
+    results: Dict[str, float] = {}
+    html = load_fixture("docs_page.html")
+
+    async def fetch_page_content(url: str) -> str:
+        return html
+
+    with ExitStack() as stack, StubServer() as stub:
+        stack.enter_context(mock.patch.object(services.scraper_service, "fetch_page_content", fetch_page_content))
+        stack.enter_context(mock.patch.object(services.llm_engine, "gemini_api_key", "recorded"))
+        # Time the actual work, not cache hits from earlier repeats.
+        for service in (services.llm_engine, services.code_generator, services.semantic_mapper):
+            stack.enter_context(mock.patch.object(service, "cache", None))
+        stack.enter_context(mock.patch("google.generativeai.GenerativeModel"))
+        generative_model = sys.modules["google.generativeai"].GenerativeModel
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def post(route: str, **kwargs):
+                if "content" in kwargs:
+                    kwargs["headers"] = {"Content-Type": "application/json"}
+                response = await client.post(route, **kwargs)
+                response.raise_for_status()
+                return response
+
+            for size in sizes:
+                schema = make_schema(size)
+                # Bodies are encoded once up front so the timings measure the server, not httpx.
+                schema_body = schema.model_dump_json()
+                semantic_body = json.dumps({"schema": json.loads(schema_body), "query": "get an item"})
+                endpoint_json = schema.endpoints[0].model_dump(mode="json")
+                services.llm_engine.gemini_model = RecordedModel(recorded_parse_response(size))
+
+                async def analyze_quality():
+                    generative_model.side_effect = lambda *a, **kw: RecordedModel(load_fixture("quality_response.txt"))
+                    return await post("/api/analyze-quality", content=schema_body)
+
+                async def semantic_map():
+                    generative_model.side_effect = lambda *a, **kw: RecordedModel(load_fixture("semantic_response.txt"))
+                    return await post("/api/semantic-map", content=semantic_body)
+
+                cases = {
+                    "route_parse": lambda: post("/api/parse", json={"url": "https://docs.example.com"}),
+                    "route_generate_sdk": lambda: post("/api/generate-sdk", content=schema_body),
+                    "route_generate_snippet": lambda: post(
+                        "/api/generate-snippet",
+                        json={"endpoint": endpoint_json, "base_url": schema.base_url, "language": "python"},
+                    ),
+                    "route_export_markdown": lambda: post("/api/export-markdown", content=schema_body),
+                    "route_export_postman": lambda: post("/api/export-postman", content=schema_body),
+                    "route_analyze_quality": analyze_quality,
+                    "route_semantic_map": semantic_map,
+                    "route_health_check": lambda: post(
+                        "/api/health-check", json={"url": f"{stub.url}/items/1", "method": "GET"}
+                    ),
+                }
+                for name, fn in cases.items():
+                    key = f"{name}[{size}]"
+                    if selected(key):
+                        results[key] = await _time_async(fn, repeat)
+                        print(f"  {key:<40} {results[key]:>10.2f} ms")
+    return results
+
+
+def run(sizes: List[int], repeat: int, only: str = None) -> Dict[str, float]:
+    selected = (lambda key: only in key) if only else (lambda key: True)
+    results: Dict[str, float] = {}
+
+    print("Services:")
+    for size in sizes:
+        for name, fn in service_cases(size).items():
+            key = f"{name}[{size}]"
+            if selected(key):
+                results[key] = _time_sync(fn, repeat)
+                print(f"  {key:<40} {results[key]:>10.2f} ms")
+
+    print("Cold start:")
+    if selected("cold_start"):
+        runs = [measure_cold_start() for _ in range(repeat)]
+        for name in ("import_ms", "process_total_ms"):
+            key = f"cold_start_{name[:-3]}"
+            results[key] = min(run[name] for run in runs)
+            print(f"  {key:<40} {results[key]:>10.2f} ms")
+
+    print("Routes:")
+    results.update(asyncio.run(run_route_cases(sizes, repeat, selected)))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float, min_delta_ms: float) -> List[str]:
+    """
+    Returns the cases that got slower than the baseline by more than the tolerance.
+    Differences below min_delta_ms are ignored, since they are mostly timer noise.
+    """
+    regressions = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current - previous > max(previous * tolerance, min_delta_ms):
+            regressions.append(f"{key}: {previous:.2f} ms -> {current:.2f} ms (+{(current / previous - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the Smart API Tool backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Endpoint counts of the synthetic schemas")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported")
+    parser.add_argument("--only", help="Only run cases whose name contains this string")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results to the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown relative to the baseline")
+    parser.add_argument("--import-profile", action="store_true", help="Also print the slowest packages imported by main")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    # Request logging would dominate the timings of the small cases.
+    logging.disable(logging.INFO)
+    results = run(args.sizes, args.repeat, args.only)
+
+    if args.import_profile:
+        print("Import profile of main (self time per package):")
+        for package, ms in import_profile()[:15]:
+            print(f"  {package:<40} {ms:>10.2f} ms")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({key: round(value, 3) for key, value in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(dict(sorted(baseline.items())), f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
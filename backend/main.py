@@ -2,23 +2,22 @@ import os
 import logging
 import asyncio
 import sys
-from typing import Dict, Any, List
-from fastapi import FastAPI, HTTPException, Body
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException, Body, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from starlette.requests import Request
 
 # Enforce ProactorEventLoop on Windows for Playwright compatibility
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
-from app.models import ApiSchema, Endpoint
-from app.services.scraper import ScraperService
-from app.services.llm_engine import LLMEngine
-from app.services.code_generator import CodeGenerator
-from app.services.health_checker import HealthChecker
-from app.services.quality_analyzer import QualityAnalyzer
-from app.services.semantic_mapper import SemanticMapper
-from app.services.exporter import Exporter
+from app.rate_limit import AdmissionMiddleware, RateLimit, RateLimitExceeded, client_identity, retry_after_header
+from app.mock_server import MockConfig, MockDispatcher
+from app.models import ApiSchema, ContractTestRequest, Endpoint, MockServerRequest, SemanticMapRequest
+from app.serialization import FastJSONResponse, body_openapi, encode_response, parse_body
+from app.services import create_services
 
 # Load environment variables
 load_dotenv()
@@ -27,7 +26,58 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Smart API Tool Backend")
+# Services are built on first use, so a worker starts serving without
+# importing Playwright, the LLM SDKs or Jinja2 up front.
+services = create_services()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker setup and teardown. Set PRELOAD_SERVICES=1 to build every
+    service before the worker takes traffic instead of on first use.
+    Parse, SDK and semantic results go to a SQLite cache shared by all workers.
+    """
+    if os.getenv("PRELOAD_SERVICES", "").lower() in ("1", "true", "yes"):
+        services.preload()
+    logger.info(f"Worker {os.getpid()} ready")
+
+    yield
+
+    await services.close()
+
+app = FastAPI(title="Smart API Tool Backend", default_response_class=FastJSONResponse, lifespan=lifespan)
+
+# Only these X-API-Key values identify a client; others are identified by IP.
+API_KEYS = [key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip()]
+_api_key_set = frozenset(key.encode("latin-1") for key in API_KEYS)
+
+# Admission control: per-client rate limits, concurrency caps for the routes
+# that drive Chromium or the LLM, and a per-client LLM token budget.
+# Added before CORS so that 429 responses still carry CORS headers.
+if os.getenv("RATE_LIMIT_ENABLED", "1").lower() not in ("0", "false", "no"):
+    app.add_middleware(
+        AdmissionMiddleware,
+        default_limit=RateLimit(
+            per_minute=float(os.getenv("RATE_LIMIT_PER_MINUTE", "120")),
+            burst=int(os.getenv("RATE_LIMIT_BURST", "30")),
+        ),
+        route_limits={
+            "/api/parse": RateLimit(per_minute=10, burst=3),
+            "/api/analyze-quality": RateLimit(per_minute=20, burst=5),
+            "/api/semantic-map": RateLimit(per_minute=30, burst=10),
+            "/api/contract-test": RateLimit(per_minute=6, burst=2),
+        },
+        concurrency_limits={
+            "/api/parse": int(os.getenv("SCRAPER_MAX_PAGES", "4")),
+            "/api/analyze-quality": 8,
+            "/api/semantic-map": 8,
+            "/api/contract-test": 4,
+        },
+        client_concurrency=int(os.getenv("RATE_LIMIT_CLIENT_CONCURRENCY", "1")),
+        llm_tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")),
+        llm_paths=("/api/parse", "/api/analyze-quality", "/api/semantic-map"),
+        api_keys=API_KEYS,
+    )
 
 # CORS Configuration
 app.add_middleware(
@@ -38,15 +88,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize Services
-scraper_service = ScraperService()
-llm_engine = LLMEngine()
-code_generator = CodeGenerator()
-health_checker = HealthChecker()
-quality_analyzer = QualityAnalyzer()
-semantic_mapper = SemanticMapper()
-exporter = Exporter()
-
 # Mount frontend static files
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -54,6 +95,9 @@ from fastapi.responses import FileResponse
 # Serve assets first to avoid conflict with catch-all
 # app.mount("/assets", StaticFiles(directory="../frontend/dist/assets"), name="assets")
 
+# Mock servers registered through /api/mocks answer under /mock/{mock_id}/...
+app.mount("/mock", MockDispatcher(lambda: services.mock_servers))
+
 @app.get("/")
 async def serve_frontend():
     return FileResponse("../frontend/dist/index.html")
@@ -63,7 +107,7 @@ async def health_check():
     return {"status": "ok", "message": "Backend is running"}
 
 @app.post("/api/parse", response_model=ApiSchema)
-async def parse_documentation(url: str = Body(..., embed=True)):
+async def parse_documentation(request: Request, url: str = Body(..., embed=True)):
     """
     Scrapes the given URL and uses LLM to parse it into an API Schema.
     """
@@ -71,35 +115,36 @@ async def parse_documentation(url: str = Body(..., embed=True)):
         logger.info(f"Received request to parse URL: {url}")
         
         # 1. Scrape content
-        html_content = await scraper_service.fetch_page_content(url)
-        text_content = scraper_service.extract_text(html_content)
+        html_content = await services.scraper_service.fetch_page_content(url)
+        text_content = services.scraper_service.extract_text(html_content)
         
         if not text_content:
             raise HTTPException(status_code=400, detail="Failed to extract content from URL")
 
         # 2. Parse with LLM
-        schema = await llm_engine.parse_documentation(text_content)
-        return schema
+        schema = await services.llm_engine.parse_documentation(text_content)
+        return encode_response(request, schema)
 
     except Exception as e:
         logger.error(f"Error processing URL: {e}")
         # Re-raise so the global handler catches it and logs to file
         raise e 
 
-@app.post("/api/generate-sdk")
-async def generate_sdk(schema: ApiSchema):
+@app.post("/api/generate-sdk", openapi_extra=body_openapi(ApiSchema))
+async def generate_sdk(request: Request, schema: ApiSchema = Depends(parse_body(ApiSchema))):
     """
     Generates a Python SDK based on the provided ApiSchema.
     """
     try:
-        sdk_code = code_generator.generate_python_sdk(schema)
-        return {"language": "python", "code": sdk_code}
+        sdk_code = services.code_generator.generate_python_sdk(schema)
+        return encode_response(request, {"language": "python", "code": sdk_code})
     except Exception as e:
         logger.error(f"Error generating SDK: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/health-check")
 async def check_endpoint_health(
+    request: Request,
     url: str = Body(...),
     method: str = Body("GET"),
     params: Dict = Body(None),
@@ -108,46 +153,144 @@ async def check_endpoint_health(
 ):
     """
     Checks the health of a specific external API endpoint.
+    Healthy JSON responses to requests without credentials are recorded for
+    the mocks this client creates.
     """
-    return await health_checker.check_endpoint_health(url, method, params, headers, body)
+    return await services.health_checker.check_endpoint_health(
+        url, method, params, headers, body, client=client_identity(request.scope, _api_key_set)
+    )
 
-@app.post("/api/analyze-quality")
-async def analyze_quality(schema: ApiSchema):
+@app.post("/api/analyze-quality", openapi_extra=body_openapi(ApiSchema))
+async def analyze_quality(schema: ApiSchema = Depends(parse_body(ApiSchema))):
     """
     Analyzes the quality of the API documentation Schema using LLM.
     """
-    return await quality_analyzer.analyze_quality(schema)
+    return await services.quality_analyzer.analyze_quality(schema)
+
+@app.post("/api/mocks", openapi_extra=body_openapi(MockServerRequest))
+async def create_mock(request: Request, body: MockServerRequest = Depends(parse_body(MockServerRequest))):
+    """
+    Starts serving a mock of the schema's endpoints, with the responses this client
+    recorded through /api/health-check or synthesized ones.
+    Returns the base URL to point clients at.
+    """
+    config = MockConfig(
+        latency_ms=body.latency_ms,
+        jitter_ms=body.jitter_ms,
+        error_rate=body.error_rate,
+        error_status=body.error_status
+    )
+    mock_id, server = services.mock_servers.add(body.api_schema, config, client_identity(request.scope, _api_key_set))
+    return {
+        "mock_id": mock_id,
+        "base_url": f"{str(request.base_url).rstrip('/')}/mock/{mock_id}",
+        "endpoint_count": len(server.index)
+    }
+
+@app.post("/api/contract-test", openapi_extra=body_openapi(ContractTestRequest))
+async def contract_test(request: Request, body: ContractTestRequest = Depends(parse_body(ContractTestRequest))):
+    """
+    Calls the schema's endpoints and validates their responses against response_schema.
+    Returns field-level drift per endpoint across all runs.
+    """
+    try:
+        report = await services.contract_tester.run(
+            body.api_schema,
+            runs=body.runs,
+            concurrency=body.concurrency,
+            methods=body.methods,
+            path_params=body.path_params,
+            headers=body.headers,
+            client=client_identity(request.scope, _api_key_set)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return encode_response(request, report)
 
-@app.post("/api/semantic-map")
-async def semantic_map(schema: ApiSchema, query: str = Body(...)):
+@app.post("/api/semantic-map", openapi_extra=body_openapi(SemanticMapRequest))
+async def semantic_map(body: SemanticMapRequest = Depends(parse_body(SemanticMapRequest))):
     """
     Maps a natural language query to the best matching endpoint in the schema.
     """
-    return await semantic_mapper.map_query_to_endpoint(schema, query)
+    return await services.semantic_mapper.map_query_to_endpoint(body.api_schema, body.query)
 
 @app.post("/api/generate-snippet")
 async def generate_snippet(endpoint: Endpoint, base_url: str = Body(...), language: str = Body(...)):
     """
     Generates a code snippet for a specific endpoint in the requested language.
     """
-    return {"code": code_generator.generate_snippet(endpoint, base_url, language)}
+    return {"code": services.code_generator.generate_snippet(endpoint, base_url, language)}
 
-@app.post("/api/export-markdown")
-async def export_markdown(schema: ApiSchema):
+@app.post("/api/export-markdown", openapi_extra=body_openapi(ApiSchema))
+async def export_markdown(request: Request, schema: ApiSchema = Depends(parse_body(ApiSchema))):
     """
     Exports the API schema to Markdown format.
     """
-    return {"markdown": exporter.convert_to_markdown(schema)}
+    return encode_response(request, {"markdown": services.exporter.convert_to_markdown(schema)})
 
-@app.post("/api/export-postman")
-async def export_postman(schema: ApiSchema):
+@app.post("/api/export-postman", openapi_extra=body_openapi(ApiSchema))
+async def export_postman(request: Request, schema: ApiSchema = Depends(parse_body(ApiSchema))):
     """
     Exports the API schema to Postman Collection format.
     """
-    return exporter.convert_to_postman(schema)
+    return encode_response(request, services.exporter.convert_to_postman(schema))
+
+@app.post("/api/schemas", openapi_extra=body_openapi(ApiSchema))
+async def register_schema(schema: ApiSchema = Depends(parse_body(ApiSchema))):
+    """
+    Registers a schema for indexed lookups and paginated listing.
+    Returns its id, endpoint count, endpoint counts per path prefix and the
+    endpoints repeating an earlier method and path, which are listed but never matched.
+    """
+    schema_id, index = services.endpoint_indexes.add(schema)
+    return {
+        "schema_id": schema_id,
+        "endpoint_count": len(index),
+        "groups": index.groups(),
+        "duplicates": [
+            {"position": p, "method": index.endpoints[p].method, "path": index.endpoints[p].path}
+            for p in index.duplicates
+        ]
+    }
+
+def get_endpoint_index(schema_id: str):
+    index = services.endpoint_indexes.get(schema_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Unknown schema id; register it with /api/schemas")
+    return index
+
+@app.get("/api/schemas/{schema_id}/endpoints")
+async def list_endpoints(
+    request: Request,
+    schema_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    method: Optional[str] = None,
+    prefix: Optional[str] = None
+):
+    """
+    Lists one page of a registered schema's endpoints, optionally filtered by method and path prefix.
+    """
+    items, total = get_endpoint_index(schema_id).page(offset, limit, method, prefix)
+    return encode_response(request, {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "items": [endpoint.to_dict() for endpoint in items]
+    })
+
+@app.get("/api/schemas/{schema_id}/match")
+async def match_endpoint(schema_id: str, url: str, method: str = "GET"):
+    """
+    Resolves a concrete URL to the endpoint whose path template matches it.
+    """
+    match = get_endpoint_index(schema_id).match(method, url)
+    if match is None:
+        raise HTTPException(status_code=404, detail=f"No endpoint matches {method.upper()} {url}")
+    endpoint, path_params = match
+    return {"endpoint": endpoint.to_dict(), "path_params": path_params}
 
 from fastapi.exceptions import RequestValidationError
-from starlette.requests import Request
 from starlette.responses import JSONResponse
 
 @app.exception_handler(RequestValidationError)
@@ -158,6 +301,15 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": "Validation Error", "errors": exc.errors()},
     )
 
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded):
+    logger.warning(f"Rate limited: {exc.detail}")
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.detail},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: RequestValidationError):
     logger.error(f"Unhandled exception: {exc}")
@@ -45,6 +45,8 @@ async def main():
         print(f"Scraping failed: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        await scraper.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
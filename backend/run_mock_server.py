@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import os
+import sys
+
+import uvicorn
+
+from app.cache import DEFAULT_CACHE_PATH
+from app.sockets import listen_options
+
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+# Standalone mock of a parsed API, for testing and load-testing API clients
+# offline. Endpoints answer with the responses one client recorded through
+# earlier health checks (read from the shared cache; --client, the local
+# frontend by default) or with examples synthesized from their response_schema. The running backend serves the same mocks under /mock/{id}
+# via POST /api/mocks; this entry point gives a mock its own port and workers.
+#
+#   python run_mock_server.py schema.json --port 9000 --workers 4 --latency-ms 20 --error-rate 0.01
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a mock of an API schema exported by the Smart API Tool")
+    parser.add_argument("schema", help="JSON file with the ApiSchema to mock")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random variation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail, 0 to 1")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code of injected errors")
+    parser.add_argument("--cache-path", default=os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH),
+                        help="Cache holding responses recorded by health checks")
+    parser.add_argument("--client", default="ip:127.0.0.1",
+                        help="Replay the responses recorded by this client ('ip:<address>' or 'key:<hash>'); empty for none")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    # Workers inherit the environment, so they all build the same mock.
+    os.environ["MOCK_SCHEMA_PATH"] = os.path.abspath(args.schema)
+    os.environ["MOCK_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["MOCK_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["MOCK_ERROR_RATE"] = str(args.error_rate)
+    os.environ["MOCK_ERROR_STATUS"] = str(args.error_status)
+    os.environ["CACHE_PATH"] = os.path.abspath(args.cache_path)
+    os.environ["MOCK_CLIENT"] = args.client
+
+    print(f"Mocking {args.schema} on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    uvicorn.run(
+        "app.mock_server:create_app_from_env",
+        factory=True,
+        workers=args.workers,
+        log_level=args.log_level,
+        access_log=False,
+        **listen_options(args.host, args.port, args.workers),
+    )
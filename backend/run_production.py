@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import os
+import sys
+
+import uvicorn
+
+from app.cache import DEFAULT_CACHE_PATH
+from app.sockets import listen_options
+
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+# Production entry point: N uvicorn worker processes, each building its own
+# services in the app's lifespan hook and sharing one SQLite cache file.
+# For development use `python main.py` or run_server.py instead.
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Smart API Tool backend with multiple workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        help="Number of worker processes (default: WEB_CONCURRENCY or the CPU count)",
+    )
+    parser.add_argument("--cache-path", default=os.getenv("CACHE_PATH", DEFAULT_CACHE_PATH),
+                        help="SQLite file shared by all workers for parse, SDK and semantic results")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Workers inherit the environment, so they all open the same cache file.
+    os.environ["CACHE_PATH"] = os.path.abspath(args.cache_path)
+
+    print(f"Starting {args.workers} workers on {args.host}:{args.port} (cache: {os.environ['CACHE_PATH']})")
+    uvicorn.run(
+        "main:app",
+        workers=args.workers,
+        log_level=args.log_level,
+        proxy_headers=True,
+        **listen_options(args.host, args.port, args.workers),
+    )
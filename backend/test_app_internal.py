@@ -7,13 +7,13 @@ sys.path.append(os.getcwd())
 
 from main import app
 
-client = TestClient(app)
-
 def test_parse():
     url = "https://old.openweathermap.org/current"
     print(f"Testing local parse with URL: {url}")
     
-    response = client.post("/api/parse", json={"url": url})
+    # The context manager runs the app's lifespan hook, which creates the services
+    with TestClient(app) as client:
+        response = client.post("/api/parse", json={"url": url})
     
     print(f"Status Code: {response.status_code}")
     print("Response JSON:")
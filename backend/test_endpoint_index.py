@@ -0,0 +1,86 @@
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.endpoint_index import EndpointIndex
+from app.models import Endpoint
+
+
+def endpoint(method, path):
+    return Endpoint(method=method, path=path, description=f"{method} {path}")
+
+
+def build_index(base_url="https://api.example.com/v1"):
+    return EndpointIndex([
+        endpoint("GET", "/users/{id}"),
+        endpoint("GET", "/users/me"),
+        endpoint("DELETE", "/users/{user_id}"),
+        endpoint("GET", "/users/{id}/orders/{order_id}"),
+        endpoint("GET", "/users/:id/orders/latest"),
+        endpoint("GET", "/health"),
+        endpoint("GET", "/users/{uid}"),  # Duplicate of the first endpoint
+    ], base_url)
+
+
+def test_literal_beats_param():
+    print("Testing literal segments against {param} segments")
+    index = build_index()
+
+    found, params = index.match("GET", "/users/me")
+    assert found.path == "/users/me" and params == {}
+
+    found, params = index.match("get", "/users/42")
+    assert found.path == "/users/{id}" and params == {"id": "42"}
+
+    # Parameter names come from each endpoint's own template.
+    found, params = index.match("DELETE", "/users/42")
+    assert params == {"user_id": "42"}
+
+    found, params = index.match("GET", "/users/7/orders/latest")
+    assert found.path == "/users/:id/orders/latest" and params == {"id": "7"}
+
+    # The literal branch is a dead end here, so matching falls back to the parameter.
+    found, params = index.match("GET", "/users/me/orders/9")
+    assert params == {"id": "me", "order_id": "9"}
+
+    assert index.match("POST", "/users/42") is None
+    assert index.match("GET", "/users") is None
+
+
+def test_base_path_stripping():
+    print("Testing base URL path stripping")
+    index = build_index()
+
+    found, params = index.match("GET", "https://api.example.com/v1/users/42?expand=1")
+    assert found.path == "/users/{id}" and params == {"id": "42"}
+    assert index.match("GET", "/v1/health")[0].path == "/health"
+    # Paths without the base path are matched as they are.
+    assert index.match("GET", "/health")[0].path == "/health"
+    assert index.match("GET", "https://api.example.com/v2/health") is None
+
+    # Without a base URL nothing is stripped.
+    assert build_index(None).match("GET", "/v1/health") is None
+
+
+def test_duplicates_are_listed():
+    print("Testing endpoints that repeat a method and template")
+    index = build_index()
+
+    assert len(index) == 7
+    assert index.duplicates == [6]
+    assert index.match("GET", "/users/1")[0].description == "GET /users/{id}"
+
+    items, total = index.page(0, 50)
+    assert total == 7 and items[-1].path == "/users/{uid}"
+    items, total = index.page(0, 50, method="GET", prefix="/users")
+    assert total == 5 and [e.path for e in items][-1] == "/users/{uid}"
+    assert index.groups() == {"/users": 6, "/health": 1}
+
+
+if __name__ == "__main__":
+    test_literal_beats_param()
+    test_base_path_stripping()
+    test_duplicates_are_listed()
+    print("All EndpointIndex tests passed")
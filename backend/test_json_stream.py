@@ -0,0 +1,78 @@
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.services.json_stream import StreamingJsonParser, parse_llm_json
+
+RESPONSE = ('{"title": "Pets", "endpoints": ['
+            '{"method": "GET", "path": "/pets", "description": "List pets"}, '
+            '{"method": "POST", "path": "/pets", "description": "Add a pet"}]}')
+
+
+def feed_in_chunks(text, size):
+    parser = StreamingJsonParser()
+    streamed = []
+    for i in range(0, len(text), size):
+        streamed += parser.feed(text[i:i + size])
+    return parser, streamed
+
+
+def test_complete_output():
+    print("Testing complete output split at every chunk size")
+    for size in range(1, len(RESPONSE) + 1):
+        parser, streamed = feed_in_chunks(RESPONSE, size)
+        assert parser.done
+        assert [e.path for e in streamed] == ["/pets", "/pets"]
+        assert parser.close()["title"] == "Pets"
+        assert not parser.truncated
+
+
+def test_truncated_output():
+    print("Testing repair of truncated output")
+    for cut, complete in ((len(RESPONSE) - 2, 2), (RESPONSE.index("Add a"), 1), (RESPONSE.index('"POST"') - 1, 1)):
+        parser, streamed = feed_in_chunks(RESPONSE[:cut], 7)
+        result = parser.close()
+        assert parser.truncated
+        assert result["title"] == "Pets"
+        assert len(streamed) == complete
+        assert result["endpoints"][0]["path"] == "/pets"
+
+    assert parse_llm_json('{"title": "Cut", "endpoints": [{"method": "GE')["title"] == "Cut"
+
+
+def test_fenced_output():
+    print("Testing prose and code fences around the JSON")
+    assert parse_llm_json(f"Here you go:\n```json\n{RESPONSE}\n```\nAnything else?")["title"] == "Pets"
+    # An example object in the prose loses to the fenced block.
+    text = f'Objects look like {{"id": 1}}.\n```json\n{RESPONSE}\n```'
+    assert parse_llm_json(text)["title"] == "Pets"
+    # A fenced block cut off mid-stream is repaired.
+    assert parse_llm_json(f"```json\n{RESPONSE[:-3]}")["title"] == "Pets"
+
+
+def test_braces_in_prose():
+    print("Testing braces in the prose before the JSON")
+    assert parse_llm_json('Use {curly} braces. {"title":"A","endpoints":[]}') == {"title": "A", "endpoints": []}
+    assert parse_llm_json('Close } and {open {"title":"B"}')["title"] == "B"
+    for size in (1, 5, 64):
+        parser, streamed = feed_in_chunks(f"Paths like /pets/{{id}} follow. {RESPONSE}", size)
+        assert parser.done
+        assert len(streamed) == 2
+        assert parser.close()["title"] == "Pets"
+
+    try:
+        parse_llm_json("Nothing but {prose} here")
+    except ValueError as e:
+        print(f"  Rejected as expected: {e}")
+    else:
+        raise AssertionError("prose without JSON was accepted")
+
+
+if __name__ == "__main__":
+    test_complete_output()
+    test_truncated_output()
+    test_fenced_output()
+    test_braces_in_prose()
+    print("All StreamingJsonParser tests passed")
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.cache import SQLiteCache
+from app.mock_server import MockConfig, MockDispatcher, MockServer, MockServerStore, synthesize_example
+from app.models import ApiSchema
+from app.services.health_checker import recording_key
+
+BASE_URL = "https://api.example.com/v1"
+SCHEMA = ApiSchema.model_validate({
+    "title": "Pets",
+    "base_url": BASE_URL,
+    "endpoints": [
+        {"method": "GET", "path": "/pets", "description": "List pets",
+         "response_schema": {"type": "array", "items": {"type": "object", "properties": {"id": {"type": "integer"}}}}},
+        {"method": "GET", "path": "/pets/{id}", "description": "Get a pet",
+         "response_schema": {"type": "object", "properties": {"id": {"type": "integer"},
+                                                              "born": {"type": "string", "format": "date"}}}},
+        {"method": "GET", "path": "/pets/mine", "description": "My pets"},
+        {"method": "DELETE", "path": "/pets/{id}", "description": "Delete a pet"},
+    ],
+})
+
+
+def temp_cache():
+    return SQLiteCache(os.path.join(tempfile.mkdtemp(), "cache.sqlite3"))
+
+
+def request(app, method, path, root_path="", **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=app, root_path=root_path)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mock") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(run())
+
+
+def test_synthesize_example():
+    print("Testing examples synthesized from response_schema")
+    assert synthesize_example({"id": "integer", "tags": ["string"], "name": "Rex"}) == \
+        {"id": 1, "tags": ["string"], "name": "Rex"}
+    assert synthesize_example({"type": "object", "properties": {
+        "when": {"type": "string", "format": "date-time"},
+        "kind": {"type": "string", "enum": ["cat", "dog"]},
+        "size": {"type": "number", "example": 4.2},
+        "ids": {"type": "array", "items": {"type": "integer"}},
+    }}) == {"when": "2024-01-01T00:00:00Z", "kind": "cat", "size": 4.2, "ids": [1]}
+    assert synthesize_example({"type": "array"}) == []
+    assert synthesize_example("uuid") == "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+
+
+def test_routing():
+    print("Testing routing by method and path template")
+    app = MockServer(SCHEMA)
+
+    response = request(app, "GET", "/pets")
+    assert response.status_code == 200 and response.json() == [{"id": 1}]
+    assert response.headers["x-mock-source"] == "synthesized"
+    assert request(app, "GET", "/pets/7").json() == {"id": 1, "born": "2024-01-01"}
+    # The literal segment wins over {id}; an endpoint without a response_schema answers {}.
+    assert request(app, "GET", "/pets/mine").json() == {}
+    # The base URL path is stripped when present.
+    assert request(app, "GET", "/v1/pets/7").json()["id"] == 1
+    assert request(app, "DELETE", "/pets/7").status_code == 200
+
+    assert request(app, "POST", "/pets").status_code == 404
+    assert request(app, "GET", "/owners").status_code == 404
+
+
+def test_forced_status():
+    print("Testing X-Mock-Status")
+    app = MockServer(SCHEMA)
+
+    response = request(app, "GET", "/pets", headers={"X-Mock-Status": "201"})
+    assert response.status_code == 201 and response.json() == [{"id": 1}]
+    response = request(app, "GET", "/pets", headers={"X-Mock-Status": "418"})
+    assert response.status_code == 418 and response.headers["x-mock-source"] == "forced"
+
+    for status in ("204", "304"):
+        response = request(app, "GET", "/pets", headers={"X-Mock-Status": status})
+        assert response.status_code == int(status) and response.content == b""
+        assert "content-length" not in response.headers and "content-type" not in response.headers
+
+    for value in ("0", "150", "600", "99999", "-1", "abc", ""):
+        response = request(app, "GET", "/pets", headers={"X-Mock-Status": value})
+        assert response.status_code == 400, value
+
+
+def test_injected_errors():
+    print("Testing error injection")
+    app = MockServer(SCHEMA, MockConfig(error_rate=1.0, error_status=502))
+    response = request(app, "GET", "/pets")
+    assert response.status_code == 502 and response.headers["x-mock-source"] == "injected"
+    assert request(app, "GET", "/owners").status_code == 404
+
+
+def test_recordings_per_client():
+    print("Testing replay of recorded responses")
+    cache = temp_cache()
+    cache.set("recorded", recording_key("ip:10.0.0.1", "GET", BASE_URL + "/pets"), '[{"id": 42}]')
+    cache.set("recorded", recording_key("ip:10.0.0.1", "GET", BASE_URL + "/pets/7"), '{"id": 7}')
+
+    own = MockServer(SCHEMA, cache=cache, client="ip:10.0.0.1")
+    response = request(own, "GET", "/pets")
+    assert response.json() == [{"id": 42}] and response.headers["x-mock-source"] == "recorded"
+    # Concrete URLs of templated endpoints are looked up on request.
+    assert request(own, "GET", "/pets/7").json() == {"id": 7}
+    assert request(own, "GET", "/pets/8").json() == {"id": 1, "born": "2024-01-01"}
+
+    # Other clients, and mocks without a client, never see the recordings.
+    for other in (MockServer(SCHEMA, cache=cache, client="ip:10.0.0.2"), MockServer(SCHEMA, cache=cache)):
+        response = request(other, "GET", "/pets")
+        assert response.json() == [{"id": 1}] and response.headers["x-mock-source"] == "synthesized"
+        assert request(other, "GET", "/pets/7").json()["id"] == 1
+
+
+def test_dispatcher():
+    print("Testing MockDispatcher path rewriting")
+    cache = temp_cache()
+    store = MockServerStore(cache)
+    mock_id, _ = store.add(SCHEMA, MockConfig(), "ip:10.0.0.1")
+    dispatcher = MockDispatcher(lambda: store)
+
+    assert request(dispatcher, "GET", f"/{mock_id}/pets/7").json()["id"] == 1
+    assert request(dispatcher, "GET", f"/{mock_id}/v1/pets").json() == [{"id": 1}]
+    assert request(dispatcher, "GET", f"/{mock_id}/owners").status_code == 404
+    assert request(dispatcher, "GET", "/unknown/pets").status_code == 404
+    # Mounted at /mock, the mount path is stripped before the mock id.
+    assert request(dispatcher, "GET", f"/mock/{mock_id}/pets/7", root_path="/mock").json()["id"] == 1
+
+    # Another worker rebuilds the same mock from the cache.
+    other_worker = MockDispatcher(lambda: MockServerStore(cache))
+    assert request(other_worker, "GET", f"/{mock_id}/pets").json() == [{"id": 1}]
+    assert MockServerStore(cache).get(mock_id).client == "ip:10.0.0.1"
+
+
+if __name__ == "__main__":
+    test_synthesize_example()
+    test_routing()
+    test_forced_status()
+    test_injected_errors()
+    test_recordings_per_client()
+    test_dispatcher()
+    print("All MockServer tests passed")
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.rate_limit import AdmissionMiddleware, RateLimit, charge_llm_tokens
+
+
+class FakeApp:
+    """
+    Downstream app: answers 200, optionally charging an LLM prompt, failing,
+    or waiting on `gate` so requests stay in flight.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = None
+        self.prompt = None
+        self.fail = False
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        if self.prompt:
+            charge_llm_tokens(self.prompt)
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise RuntimeError("boom")
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def make_middleware(**kwargs):
+    app = FakeApp()
+    options = dict(default_limit=RateLimit(per_minute=6000, burst=100))
+    options.update(kwargs)
+    return AdmissionMiddleware(app, **options), app
+
+
+async def call(middleware, path="/api/items", ip="10.0.0.1", api_key=None):
+    headers = [(b"x-api-key", api_key.encode())] if api_key else []
+    scope = {"type": "http", "path": path, "headers": headers, "client": (ip, 50000)}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(scope, None, send)
+    start = sent[0]
+    headers = dict(start["headers"])
+    body = json.loads(sent[1]["body"]) if start["status"] == 429 else None
+    return start["status"], headers.get(b"retry-after"), body
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_rejects_with_retry_after():
+    print("Testing 429 with Retry-After once the burst is spent")
+    middleware, app = make_middleware(default_limit=RateLimit(per_minute=60, burst=2))
+    assert [run(call(middleware))[0] for _ in range(2)] == [200, 200]
+    status, retry_after, body = run(call(middleware))
+    assert status == 429 and retry_after == b"1" and body == {"detail": "Too many requests"}
+    assert app.calls == 2
+    # Other clients and exempt paths are unaffected.
+    assert run(call(middleware, ip="10.0.0.2"))[0] == 200
+    assert run(call(middleware, path="/api/health"))[0] == 200
+    assert run(call(middleware, path="/mock/abc/pets"))[0] == 200
+
+
+def test_route_buckets():
+    print("Testing per-route buckets")
+    middleware, _ = make_middleware(route_limits={"/api/parse": RateLimit(per_minute=1, burst=1)})
+    assert run(call(middleware, "/api/parse"))[0] == 200
+    status, retry_after, body = run(call(middleware, "/api/parse"))
+    assert status == 429 and int(retry_after) >= 59
+    assert body == {"detail": "Too many requests to /api/parse"}
+    # The route limit does not spill over to other routes or clients.
+    assert run(call(middleware, "/api/export-markdown"))[0] == 200
+    assert run(call(middleware, "/api/parse", ip="10.0.0.2"))[0] == 200
+
+
+def test_unknown_api_keys_are_ignored():
+    print("Testing X-API-Key identification")
+    middleware, _ = make_middleware(default_limit=RateLimit(per_minute=60, burst=1), api_keys=["good"])
+    # Rotating unknown keys still counts against the IP.
+    assert run(call(middleware, api_key="random-1"))[0] == 200
+    assert run(call(middleware, api_key="random-2"))[0] == 429
+    # A configured key gets a bucket of its own.
+    assert run(call(middleware, api_key="good"))[0] == 200
+    assert run(call(middleware, api_key="good"))[0] == 429
+
+    assert middleware.client_id({"headers": [(b"x-api-key", b"good")], "client": ("10.0.0.1", 1)}).startswith("key:")
+    assert middleware.client_id({"headers": [(b"x-api-key", b"bad")], "client": ("10.0.0.1", 1)}) == "ip:10.0.0.1"
+    # Without configured keys the header is never trusted.
+    unkeyed, _ = make_middleware()
+    assert unkeyed.client_id({"headers": [(b"x-api-key", b"good")], "client": ("10.0.0.1", 1)}) == "ip:10.0.0.1"
+
+
+def test_concurrency_slots():
+    print("Testing concurrency caps and slot release")
+    middleware, app = make_middleware(concurrency_limits={"/api/parse": 2}, client_concurrency=1)
+
+    async def scenario():
+        app.gate = asyncio.Event()
+        first = asyncio.create_task(call(middleware, "/api/parse", ip="10.0.0.1"))
+        await asyncio.sleep(0)
+        # One slot per client...
+        status, retry_after, body = await call(middleware, "/api/parse", ip="10.0.0.1")
+        assert status == 429 and body == {"detail": "Too many concurrent requests to /api/parse from this client"}
+        second = asyncio.create_task(call(middleware, "/api/parse", ip="10.0.0.2"))
+        await asyncio.sleep(0)
+        # ...and two for the route.
+        status, _, body = await call(middleware, "/api/parse", ip="10.0.0.3")
+        assert status == 429 and body == {"detail": "Too many concurrent requests to /api/parse"}
+        app.gate.set()
+        await asyncio.gather(first, second)
+        app.gate = None
+
+    run(scenario())
+    assert middleware._in_flight == {"/api/parse": 0} and middleware._client_in_flight == {}
+
+    # A request that raises still releases its slots.
+    app.fail = True
+    try:
+        run(call(middleware, "/api/parse"))
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the app's exception was swallowed")
+    app.fail = False
+    assert middleware._in_flight == {"/api/parse": 0} and middleware._client_in_flight == {}
+    assert run(call(middleware, "/api/parse"))[0] == 200
+
+
+def test_llm_budget():
+    print("Testing the LLM token budget")
+    middleware, app = make_middleware(llm_tokens_per_minute=600, llm_paths=("/api/parse",))
+    app.prompt = "x" * 4000  # About 1000 tokens, more than the budget holds.
+    assert run(call(middleware, "/api/parse"))[0] == 200
+
+    # The budget is now negative: LLM routes are rejected before doing any work.
+    calls = app.calls
+    status, retry_after, body = run(call(middleware, "/api/parse"))
+    assert status == 429 and body == {"detail": "LLM token budget exhausted"} and int(retry_after) >= 40
+    assert app.calls == calls
+    # Routes that do not call the LLM are still served.
+    app.prompt = None
+    assert run(call(middleware, "/api/export-markdown"))[0] == 200
+    assert run(call(middleware, "/api/parse", ip="10.0.0.2"))[0] == 200
+
+
+def test_bucket_cap():
+    print("Testing the cap on stored buckets")
+    middleware, _ = make_middleware()
+    middleware.max_buckets = 10
+    for i in range(100):
+        run(call(middleware, ip=f"10.0.1.{i}"))
+    assert len(middleware._buckets) == 10
+    # The most recently used clients are the ones kept.
+    assert ("ip:10.0.1.99", "*") in middleware._buckets and ("ip:10.0.1.0", "*") not in middleware._buckets
+
+
+if __name__ == "__main__":
+    test_rejects_with_retry_after()
+    test_route_buckets()
+    test_unknown_api_keys_are_ignored()
+    test_concurrency_slots()
+    test_llm_budget()
+    test_bucket_cap()
+    print("All AdmissionMiddleware tests passed")
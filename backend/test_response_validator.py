@@ -0,0 +1,84 @@
+import json
+import os
+import random
+import sys
+
+# Add app to path
+sys.path.append(os.getcwd())
+
+from app.services.response_validator import StreamingValidator, compile_schema, validate_json
+
+USER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "status": {"type": "string", "enum": ["active", "banned"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "address": {"type": "object", "properties": {"city": {"type": "string"}}, "required": ["city"]},
+    },
+    "required": ["id", "name", "status"],
+}
+
+DOCUMENTS = [
+    # Compliant
+    (USER_SCHEMA, {"id": 1, "name": "Ann", "status": "active", "tags": ["a", "b"], "address": {"city": "Oslo"}}),
+    # Wrong types, unknown enum value, missing and unexpected fields, escapes and unicode in strings
+    (USER_SCHEMA, {"id": "1", "name": "Bo \"the\" \\ é中", "status": "gone", "tags": [1, None],
+                   "address": {}, "extra": [{"x": 1}], "n": -1.5e3, "ok": True}),
+    # Root array of objects, in the example-shaped form the LLM extracts
+    ({"type": "array", "items": {"type": "object", "properties": {"id": {"type": "integer"}}, "required": ["id"]}},
+     [{"id": i} if i % 7 else {"id": str(i), "more": "x" * i} for i in range(60)]),
+    ({"id": "integer", "tags": ["string"], "name": "Rex"},
+     {"id": 3.5, "tags": ["a", 2, {"k": "v"}], "name": None}),
+]
+
+
+def chunked(text, rng):
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 12)
+        yield text[i:i + size]
+        i += size
+
+
+def stream_issues(check, chunks):
+    validator = StreamingValidator(check)
+    for chunk in chunks:
+        validator.feed(chunk)
+    return validator.close()
+
+
+def test_agrees_with_validate_json():
+    print("Testing StreamingValidator against validate_json across chunk boundaries")
+    rng = random.Random(1234)
+    for schema, document in DOCUMENTS:
+        check = compile_schema(schema)
+        for indent in (None, 2):
+            text = json.dumps(document, indent=indent, ensure_ascii=False)
+            expected = validate_json(check, text)
+            # Every single split point, then random chunkings.
+            for cut in range(len(text) + 1):
+                assert stream_issues(check, [text[:cut], text[cut:]]) == expected, (text, cut)
+            for _ in range(50):
+                assert stream_issues(check, chunked(text, rng)) == expected
+    print(f"  {len(DOCUMENTS)} documents agree")
+
+
+def test_rejects_malformed_streams():
+    print("Testing malformed and truncated streams")
+    check = compile_schema(USER_SCHEMA)
+    for text in ('{"id": 1, "name": "A"', '{"id": 1,, "name": "A"}', '{"id": 1} {"id": 2}', '[1, 2', '{"id": tru'):
+        for cut in range(len(text) + 1):
+            try:
+                stream_issues(check, [text[:cut], text[cut:]])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"accepted {text!r} split at {cut}")
+
+
+if __name__ == "__main__":
+    test_agrees_with_validate_json()
+    test_rejects_malformed_streams()
+    print("All StreamingValidator tests passed")
@@ -28,13 +28,51 @@ interface ApiViewerProps {
 
 import { EndpointTester } from './EndpointTester';
 import { CodeModal } from './CodeModal';
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
+
+// Large specs have thousands of endpoints; rendering each with its tester at once freezes the page.
+const PAGE_SIZE = 25;
 
 export function ApiViewer({ schema }: ApiViewerProps) {
     const [selectedEndpoint, setSelectedEndpoint] = useState<Endpoint | null>(null);
+    const [page, setPage] = useState(0);
+
+    useEffect(() => {
+        setPage(0);
+    }, [schema]);
 
     if (!schema) return null;
 
+    const pageCount = Math.max(1, Math.ceil(schema.endpoints.length / PAGE_SIZE));
+    const pageStart = Math.min(page, pageCount - 1) * PAGE_SIZE;
+    const visibleEndpoints = schema.endpoints.slice(pageStart, pageStart + PAGE_SIZE);
+    const pageButtonStyle = { background: 'white', border: '1px solid #e5e7eb', padding: '0.35rem 0.85rem', borderRadius: '6px', fontSize: '0.85rem', cursor: 'pointer', color: '#4b5563', fontWeight: 500 };
+
+    const pagination = pageCount > 1 && (
+        <div style={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', gap: '1rem', margin: '1rem 0' }}>
+            <span style={{ fontSize: '0.9rem', color: '#6b7280' }}>
+                Endpoints {pageStart + 1}–{pageStart + visibleEndpoints.length} of {schema.endpoints.length}
+            </span>
+            <div style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+                <button
+                    onClick={() => setPage(pageStart / PAGE_SIZE - 1)}
+                    disabled={pageStart === 0}
+                    style={{ ...pageButtonStyle, opacity: pageStart === 0 ? 0.5 : 1 }}
+                >
+                    Previous
+                </button>
+                <span style={{ fontSize: '0.85rem', color: '#4b5563' }}>Page {pageStart / PAGE_SIZE + 1} of {pageCount}</span>
+                <button
+                    onClick={() => setPage(pageStart / PAGE_SIZE + 1)}
+                    disabled={pageStart / PAGE_SIZE + 1 >= pageCount}
+                    style={{ ...pageButtonStyle, opacity: pageStart / PAGE_SIZE + 1 >= pageCount ? 0.5 : 1 }}
+                >
+                    Next
+                </button>
+            </div>
+        </div>
+    );
+
     return (
         <div style={{
             background: 'white',
@@ -82,9 +120,10 @@ export function ApiViewer({ schema }: ApiViewerProps) {
             )}
 
             <div style={{ marginBottom: '1rem' }}></div>
+            {pagination}
             <div style={{ display: 'flex', flexDirection: 'column', gap: '1.5rem' }}>
-                {schema.endpoints.map((endpoint, index) => (
-                    <div key={index} style={{ border: '1px solid #e5e7eb', borderRadius: '12px', overflow: 'hidden', background: '#fff' }}>
+                {visibleEndpoints.map((endpoint, index) => (
+                    <div key={pageStart + index} style={{ border: '1px solid #e5e7eb', borderRadius: '12px', overflow: 'hidden', background: '#fff' }}>
                         <div style={{
                             background: '#fff',
                             padding: '1.25rem',
@@ -170,6 +209,7 @@ export function ApiViewer({ schema }: ApiViewerProps) {
                     </div>
                 ))}
             </div>
+            {pagination}
 
             {selectedEndpoint && schema.base_url && (
                 <CodeModal